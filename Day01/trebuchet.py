@@ -1,37 +1,134 @@
-# Star 1
-line_digits = []
-with open('input.txt','r') as input:
-    for line in input:
-        digits = []
-        for char in line:
-            if char.isdigit():
-                digits.append(char)
-        line_digits.append(digits)
-
-cal_vals = []
-for digits in line_digits:
-    cal_vals.append(int(digits[0]+digits[-1]))
-
-print(sum(cal_vals))
-
-# Star 2
-digit_strings = ['zero','one','two','three','four','five','six','seven','eight','nine']
-
-line_digits = []
-with open('input.txt','r') as input:
-    for line in input:
-        digits = []
-        for idx in range(len(line)):
-            if line[idx].isdigit():
-                digits.append(int(line[idx]))
-            else:
-                for digit, text in enumerate(digit_strings):
-                    if line[idx:].startswith(text):
-                        digits.append(digit)
-        line_digits.append(digits)
-
-cal_vals = []
-for digits in line_digits:
-    cal_vals.append(10*digits[0]+digits[-1])
-
-print(sum(cal_vals))
\ No newline at end of file
+from argparse import ArgumentParser
+from collections import deque
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import map_input as read_input
+from utils import follow_solver, profile_solver, solve_with_metrics
+
+DIGIT_STRINGS = ['zero','one','two','three','four','five','six','seven','eight','nine']
+NEWLINE, ZERO = b'\n0'
+
+def build_automaton(patterns):
+    '''
+    Aho-Corasick automaton over bytes for a {pattern: digit} dict, with the failure links folded
+    into a dense 256-wide transition row per state so scanning costs one lookup per byte and
+    overlapping matches like "eightwo" are all seen. Returns (transitions, outputs), where
+    outputs[state] is the digit of the pattern ending at state or -1.
+    '''
+    goto, outputs = [{}], [-1]
+    for pattern, digit in patterns.items():
+        state = 0
+        for byte in pattern.encode():
+            if byte not in goto[state]:
+                goto[state][byte] = len(goto)
+                goto.append({})
+                outputs.append(-1)
+            state = goto[state][byte]
+        outputs[state] = digit
+
+    transitions = [[0] * 256 for _ in goto]
+    fail = [0] * len(goto)
+    queue = deque()
+    for byte, child in goto[0].items():
+        transitions[0][byte] = child
+        queue.append(child)
+    # Breadth first, so a state's failure target always has its row finished already
+    while queue:
+        state = queue.popleft()
+        if outputs[state] == -1:
+            outputs[state] = outputs[fail[state]]
+        row = list(transitions[fail[state]])
+        for byte, child in goto[state].items():
+            fail[child] = transitions[fail[state]][byte]
+            row[byte] = child
+            queue.append(child)
+        transitions[state] = row
+    return transitions, outputs
+
+# Spelled digits and digit characters, either of which counts for star 2
+AUTOMATON = build_automaton({**{text: digit for digit, text in enumerate(DIGIT_STRINGS)},
+                             **{str(digit): digit for digit in range(10)}})
+
+def calibration_total(buffer):
+    '''
+    Sum of the star 2 calibration values in a single pass over a bytes-like buffer of lines, such
+    as the mapped input, holding nothing but the current line's first and last digit.
+    '''
+    transitions, outputs = AUTOMATON
+    total = 0
+    first = last = -1
+    state = 0
+    for byte in memoryview(buffer):
+        if byte == NEWLINE:
+            if first != -1:
+                total += 10*first + last
+            first = last = -1
+            state = 0
+            continue
+        state = transitions[state][byte]
+        digit = outputs[state]
+        if digit != -1:
+            if first == -1:
+                first = digit
+            last = digit
+    if first != -1:
+        total += 10*first + last
+    return total
+
+def star1(data):
+    '''
+    Star 1 only needs the first and last digit character of each line, so it is found with array
+    operations over the whole buffer instead of the automaton scan star 2 needs.
+    '''
+    import numpy as np
+    raw = np.frombuffer(data, dtype=np.uint8)
+    # Digits and newlines in file order; a digit just after a newline starts its line's digits and
+    # one just before a newline ends them. uint8 wraps, so only digits land below 10
+    values = raw[((raw - ZERO) < 10) | (raw == NEWLINE)]
+    is_digit = values != NEWLINE
+    bounded = np.concatenate(([False], is_digit, [False]))
+    firsts = values[is_digit & ~bounded[:-2]].astype(np.int64) - ZERO
+    lasts = values[is_digit & ~bounded[2:]].astype(np.int64) - ZERO
+    return int(10*firsts.sum() + lasts.sum())
+
+def star2(data):
+    return calibration_total(data)
+
+class Stream:
+    separator = '\n'
+
+    def __init__(self) -> None:
+        self.totals = [0, 0]
+
+    def feed(self, line):
+        line = line.encode()
+        self.totals[0] += star1(line)
+        self.totals[1] += calibration_total(line)
+
+    def answers(self):
+        return tuple(self.totals)
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--follow', action='store_true', help='read lines as they arrive on input_file, or stdin for -, printing answers as they go')
+    args = parser.parse_args()
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.follow:
+        follow_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
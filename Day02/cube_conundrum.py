@@ -1,64 +1,114 @@
-class GameHand:
-    def __init__(self, red=0, blue=0, green=0) -> None:
-        self.red = red
-        self.blue = blue
-        self.green = green
-
-class GameData:
-    def __init__(self, gid, hands) -> None:
-        self.gid = gid
+from argparse import ArgumentParser
+import numpy as np
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import follow_solver, map_input, parse_ints, profile_solver, solve_with_metrics
+
+# Column of each color in a hand's counts
+RED, GREEN, BLUE = range(3)
+COLORS = {ord('r'): RED, ord('g'): GREEN, ord('b'): BLUE}
+
+class GameStore:
+    '''
+    Every game column by column: hands is an (n_hands, 3) array of red, green and blue counts and
+    game i holds hands[offsets[i]:offsets[i+1]], with its id in gids[i].
+    '''
+    __slots__ = ('gids', 'hands', 'offsets')
+
+    def __init__(self, gids, hands, offsets) -> None:
+        self.gids = gids
         self.hands = hands
+        self.offsets = offsets
+
+    def maxima(self):
+        'Largest count of each color per game, the fewest cubes that game needs in the bag.'
+        if not len(self.gids):
+            return np.zeros((0, 3), dtype=np.int64)
+        return np.maximum.reduceat(self.hands, self.offsets[:-1])
+
+    def possible(self, limits):
+        'Which games are possible under each (max_red, max_green, max_blue) row of limits, as (n_limits, n_games).'
+        limits = np.asarray(limits).reshape(-1, 3)
+        return (self.maxima()[np.newaxis] <= limits[:, np.newaxis]).all(axis=2)
+
+    def possible_id_sums(self, limits):
+        'Sum of the ids of the possible games under each row of limits.'
+        return self.possible(limits) @ self.gids
+
+    def powers(self):
+        return self.maxima().prod(axis=1)
+
+def parse_games(raw):
+    '''
+    GameStore of a whole uint8 buffer of games in one pass of array operations. The first number on
+    each line is the game id and every later number is a count, coloured by the letter after it.
+    '''
+    values, line_offsets = parse_ints(raw)
+    line_offsets = np.unique(line_offsets)
+    gids = values[line_offsets[:-1]]
+    counts = np.delete(values, line_offsets[:-1])
+
+    # Color names start one space after the last digit of their count
+    letters = np.zeros(len(raw), dtype=bool)
+    letters[2:] = ((raw[2:] == ord('r')) | (raw[2:] == ord('g')) | (raw[2:] == ord('b'))) \
+        & (raw[1:-1] == ord(' ')) & ((raw[:-2] - ord('0')) < 10)
+    color_pos = letters.nonzero()[0]
+    color = np.zeros(256, dtype=np.int64)
+    color[list(COLORS)] = list(COLORS.values())
+
+    # A hand starts after the colon of its game or the semicolon before it
+    hand_starts = ((raw == ord(':')) | (raw == ord(';'))).nonzero()[0]
+    hands = np.zeros((len(hand_starts), 3), dtype=np.int64)
+    hands[np.searchsorted(hand_starts, color_pos) - 1, color[raw[color_pos]]] = counts
+    offsets = np.append(np.searchsorted(hand_starts, (raw == ord(':')).nonzero()[0]), len(hand_starts))
+    return GameStore(gids, hands, offsets)
+
+def read_input(input_file):
+    return parse_games(np.frombuffer(map_input(input_file), dtype=np.uint8))
+
+def star1(games):
+    return int(games.possible_id_sums((12, 13, 14))[0])
+
+def star2(games):
+    return int(games.powers().sum())
+
+class Stream:
+    separator = '\n'
+
+    def __init__(self) -> None:
+        self.valid_game_id_sum = 0
+        self.game_power_sum = 0
+
+    def feed(self, line):
+        game = parse_games(np.frombuffer(line.encode(), dtype=np.uint8))
+        # A lone game scores its id if it is possible and nothing otherwise
+        self.valid_game_id_sum += star1(game)
+        self.game_power_sum += star2(game)
+
+    def answers(self):
+        return self.valid_game_id_sum, self.game_power_sum
+
+def solve(data):
+    return star1(data), star2(data)
 
-    def is_valid_replace(self, max_red, max_blue, max_green):
-        for hand in self.hands:
-            if hand.red > max_red or hand.blue > max_blue or hand.green > max_green:
-                return False
-        return True
-    
-    def power(self):
-        min_red, min_blue, min_green = 0, 0, 0
-        for hand in self.hands:
-            if hand.red > min_red:
-                min_red = hand.red
-            if hand.blue > min_blue:
-                min_blue = hand.blue
-            if hand.green > min_green:
-                min_green = hand.green
-        return min_red * min_blue * min_green
-
-def parse_game(game_string):
-    idx_part, hands_part = game_string.split(':')
-    game_idx = int(idx_part.split()[-1])
-
-    game_hands = []
-    hands = hands_part.split(';')
-    for hand in hands:
-        color_vals = {}
-        for color in hand.split(','):
-            color_vals[color.split()[1]] = int(color.split()[0])
-        game_hands.append(GameHand(**color_vals))
-
-    return GameData(game_idx, game_hands)
-
-def main():
-    games = []
-    with open('input.txt','r') as input:
-        for line in input:
-            games.append(parse_game(line))
-
-    # Star 1
-    max_red, max_green, max_blue = 12, 13, 14
-    valid_game_id_sum = 0
-    for game in games:
-        if game.is_valid_replace(max_red, max_blue, max_green):
-            valid_game_id_sum += game.gid
-    print(valid_game_id_sum)
-
-    # Star 2
-    game_power_sum = 0
-    for game in games:
-        game_power_sum += game.power()
-    print(game_power_sum)
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = ArgumentParser()
+    parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--follow', action='store_true', help='read lines as they arrive on input_file, or stdin for -, printing answers as they go')
+    args = parser.parse_args()
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.follow:
+        follow_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
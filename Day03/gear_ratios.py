@@ -1,9 +1,16 @@
+from argparse import ArgumentParser
 import numpy as np
 from math import prod
 from dataclasses import dataclass
 from collections import defaultdict
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_grid as read_input
+from utils import DOT, STAR, ZERO, NINE
+from utils import Engines, profile_solver, solve_with_metrics
 
-@dataclass
+@dataclass(slots=True)
 class EnginePart():
     value: int
     row: int
@@ -32,10 +39,13 @@ class EnginePart():
         neighbors = self.get_neighbors(schematic)
         gears = set()
         for neighbor in neighbors:
-            if schematic[neighbor] == '*':
+            if schematic[neighbor] == STAR:
                 gears.add(neighbor)
         return gears
 
+def is_digit(char):
+    return ZERO <= char <= NINE
+
 def is_valid_idx(schematic: np.array, idx: tuple):
     height, width = schematic.shape
     if not 0 <= idx[0] < height:
@@ -45,34 +55,27 @@ def is_valid_idx(schematic: np.array, idx: tuple):
     return True
 
 def get_part(schematic: np.array, idx: tuple):
-    if not schematic[idx].isdigit():
+    if not is_digit(schematic[idx]):
         return None
     
     row, col = idx
     
     left = col
-    while is_valid_idx(schematic, (idx[0], left-1)) and schematic[(idx[0], left-1)].isdigit():
+    while is_valid_idx(schematic, (idx[0], left-1)) and is_digit(schematic[(idx[0], left-1)]):
         left -= 1
 
     right = col
-    while is_valid_idx(schematic, (idx[0], right+1)) and schematic[(idx[0], right+1)].isdigit():
+    while is_valid_idx(schematic, (idx[0], right+1)) and is_digit(schematic[(idx[0], right+1)]):
         right += 1
 
-    value = int(''.join(schematic[row, left:right+1]))
+    value = int(schematic[row, left:right+1].tobytes())
     part = EnginePart(value, row, left, right)
     for neighbor in part.get_neighbors(schematic):
-        if not schematic[neighbor].isdigit() and not schematic[neighbor] == '.':
+        if not is_digit(schematic[neighbor]) and not schematic[neighbor] == DOT:
             return part
     return None
 
-def main():
-    schematic = []
-    with open('input.txt','r') as input:
-        for line in input:
-            schematic.append([char for char in line.strip()])
-    schematic = np.array(schematic)
-
-    # Star 1
+def find_parts(schematic):
     parts = []
     last_part = EnginePart(-1,-1,-1,-1)
     for row in range(schematic.shape[0]):
@@ -82,21 +85,111 @@ def main():
                 if part is not None:
                     parts.append(part)
                     last_part = part
+    return parts
 
-    print(sum(part.value for part in parts))
+ENGINES = Engines(default='labels')
 
-    # Star 2
+@ENGINES.register('scan')
+def scan_parts(schematic):
+    '''
+    Reference engine: walk every cell, growing each number found into an EnginePart. Returns the
+    value of every part next to a symbol and the ratio of every gear.
+    '''
+    parts = find_parts(schematic)
     potential_gears = defaultdict(list)
     for part in parts:
         for gear in part.get_potential_gears(schematic):
             potential_gears[gear].append(part.value)
+    gear_ratios = [prod(values) for values in potential_gears.values() if len(values) == 2]
+    return [part.value for part in parts], gear_ratios
 
-    total_gear_ratio = 0
-    for gear, values in potential_gears.items():
-        if len(values) == 2:
-            total_gear_ratio += prod(values)
-    
-    print(total_gear_ratio)
+@ENGINES.register('labels')
+def label_parts(schematic):
+    '''
+    Label every run of digits at once, find the parts where the runs meet a dilated symbol mask and
+    read each gear's parts off the labels around its star, all as whole-array passes.
+    '''
+    height, width = schematic.shape
+    # A border of dots keeps runs from wrapping onto the next row and every star's neighbors in bounds
+    grid = np.full((height+2, width+2), DOT, dtype=np.uint8)
+    grid[1:-1, 1:-1] = schematic
+    raw = grid.ravel()
+    # Offsets of the 3x3 block around a cell of raw, the cell itself last
+    block = np.array([row*(width+2) + col for row in (-1, 0, 1) for col in (-1, 0, 1) if row or col] + [0])
+
+    # Run i, in reading order, is labelled i+1 on each of its digits, and everything else 0
+    digit = (raw - ZERO) < 10
+    starts = digit.copy()
+    starts[1:] &= ~digit[:-1]
+    ends = digit.copy()
+    ends[:-1] &= ~digit[1:]
+    first = starts.nonzero()[0]
+    lengths = (ends.nonzero()[0] - first + 1).astype(np.int32)
+    labels = starts.astype(np.int32)
+    np.cumsum(labels, out=labels)
+    labels *= digit
+    del starts, ends
+
+    # Each run's value, one digit place per pass over the runs still long enough to have it
+    values = (raw[first] - ZERO).astype(np.int64)
+    longer = np.arange(len(first))
+    for place in range(1, lengths.max(initial=0)):
+        longer = longer[lengths[longer] > place]
+        values[longer] = 10*values[longer] + (raw[first[longer] + place] - ZERO)
+    del first, lengths, longer
+
+    symbol = ~digit & (raw != DOT)
+    near_symbol = np.zeros(raw.shape, dtype=bool)
+    for shift in block:
+        near_symbol[max(shift, 0):len(raw)+min(shift, 0)] |= symbol[max(-shift, 0):len(raw)-max(shift, 0)]
+    del symbol
+    near_symbol &= digit
+    is_part = np.zeros(len(values)+1, dtype=bool)
+    is_part[labels[near_symbol]] = True
+    part_values = values[is_part[1:]]
+    del near_symbol, digit
+
+    # Sorted labels of the 3x3 block around each star, with 0 for cells outside any number
+    stars = (raw == STAR).nonzero()[0]
+    around = np.empty((len(stars), len(block)-1), dtype=labels.dtype)
+    for column, shift in enumerate(block[:-1]):
+        around[:, column] = labels[stars + shift]
+    around.sort(axis=1)
+    new_label = np.ones(around.shape, dtype=bool)
+    new_label[:, 1:] = around[:, 1:] != around[:, :-1]
+    is_gear = (new_label & (around > 0)).sum(axis=1) == 2
+    around = around[is_gear]
+    # With exactly two numbers around a star they are its last label and the first one after the zeros
+    smallest = around[np.arange(len(around)), (around == 0).sum(axis=1)]
+    gear_ratios = values[smallest - 1] * values[around[:, -1] - 1]
+    return part_values, gear_ratios
+
+def star1(schematic):
+    return int(np.sum(ENGINES(schematic)[0]))
+
+def star2(schematic):
+    return int(np.sum(ENGINES(schematic)[1]))
+
+def solve(data):
+    part_values, gear_ratios = ENGINES(data)
+    return int(np.sum(part_values)), int(np.sum(gear_ratios))
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = ArgumentParser()
+    parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--engine', choices=ENGINES.names(), help=f'implementation to run (default: {ENGINES.default})')
+    args = parser.parse_args()
+    ENGINES.select(args.engine)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
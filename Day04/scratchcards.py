@@ -1,4 +1,9 @@
-from collections import defaultdict
+from argparse import ArgumentParser
+from collections import defaultdict, deque
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import follow_solver, iter_lines, profile_solver, solve_with_metrics
 
 def find_matches(input_line):
     input_line = input_line.strip()
@@ -12,25 +17,69 @@ def find_matches(input_line):
             matches += 1
     return matches
 
-def main():
+def read_input(input_file):
+    return [find_matches(line) for line in iter_lines(input_file)]
+
+def star1(card_matches):
     points = 0
+    for matches in card_matches:
+        if matches:
+            points += 2**(matches-1)
+    return points
+
+def star2(card_matches):
     num_copies = defaultdict(int)
-    final_card_no = 1
-    with open('input.txt','r') as input:
-        for card_no, line in enumerate(input, start=1):
-            matches = find_matches(line)
-            # Star 1
-            if matches:
-                points += 2**(matches-1)
-
-            # Star 2
-            num_copies[card_no] += 1
-            for copy_card_offset in range(1, matches+1):
-                num_copies[card_no+copy_card_offset] += num_copies[card_no]
-            final_card_no = card_no
-
-    print(points)
-    print(sum(num_copies[card_no] for card_no in range(1, final_card_no+1)))
+    for card_no, matches in enumerate(card_matches, start=1):
+        num_copies[card_no] += 1
+        for copy_card_offset in range(1, matches+1):
+            num_copies[card_no+copy_card_offset] += num_copies[card_no]
+    return sum(num_copies[card_no] for card_no in range(1, len(card_matches)+1))
+
+class Stream:
+    separator = '\n'
+
+    def __init__(self) -> None:
+        self.points = 0
+        self.total_copies = 0
+        # Copies won for the cards after the last one read. A card only reaches as far ahead as
+        # its matches, so this never grows past the count of winning numbers
+        self.pending_copies = deque()
+
+    def feed(self, line):
+        matches = find_matches(line)
+        if matches:
+            self.points += 2**(matches-1)
+        copies = 1 + (self.pending_copies.popleft() if self.pending_copies else 0)
+        self.total_copies += copies
+        while len(self.pending_copies) < matches:
+            self.pending_copies.append(0)
+        for offset in range(matches):
+            self.pending_copies[offset] += copies
+
+    def answers(self):
+        # Copies won for cards past the end of the table are never counted
+        return self.points, self.total_copies
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
-    main()
+    parser = ArgumentParser()
+    parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--follow', action='store_true', help='read lines as they arrive on input_file, or stdin for -, printing answers as they go')
+    args = parser.parse_args()
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.follow:
+        follow_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,4 +1,8 @@
 from argparse import ArgumentParser
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import Engines, cached_parse, profile_solver, read_ints, solve_with_metrics
 
 class RangeMap():
     def __init__(self) -> None:
@@ -32,71 +36,52 @@ def merge_ranges(ranges):
 
     return [range(interval[0],interval[1]) for interval in new_ranges]
     
-def create_map_from_section(data, starting_data_idx):
+def create_map_from_section(section):
     this_map = RangeMap()
-    # Stops when it finds the empty line that comes after each section
-    data_idx = starting_data_idx
-    while data_idx < len(data) and data[data_idx]:
-        entry = data[data_idx]
-        dest, src, length = (int(number) for number in entry.split())
+    for dest, src, length in section:
         this_map.add_range(dest, src, length)
-        data_idx += 1
-    return this_map, data_idx
+    return this_map
 
-def main(data):
-    data_idx = 3
-    seed_to_soil, data_idx = create_map_from_section(data, data_idx)
-    soil_to_fertilizer, data_idx = create_map_from_section(data, data_idx+2)
-    fertilizer_to_water, data_idx = create_map_from_section(data, data_idx+2)
-    water_to_light, data_idx = create_map_from_section(data, data_idx+2)
-    light_to_temperature, data_idx = create_map_from_section(data, data_idx+2)
-    temperature_to_humidity, data_idx = create_map_from_section(data, data_idx+2)
-    humidity_to_location, data_idx = create_map_from_section(data, data_idx+2)
-
-    # Star 1
-    seeds = [int(seed) for seed in data[0][6:].split()]
+@cached_parse(version=1)
+def read_input(input_file):
+    values, offsets = read_ints(input_file)
+    values, offsets = values.tolist(), offsets.tolist()
+    seeds = values[offsets[0]:offsets[1]]
+    # Blank lines and "x-to-y map:" headers hold no numbers, so they separate the sections
+    sections = [[]]
+    for start, stop in zip(offsets[1:-1], offsets[2:]):
+        if stop > start:
+            sections[-1].append(values[start:stop])
+        elif sections[-1]:
+            sections.append([])
+    if not sections[-1]:
+        sections.pop()
+    # seed-to-soil, soil-to-fertilizer, ..., humidity-to-location
+    return seeds, [create_map_from_section(section) for section in sections]
 
+def star1(data):
+    seeds, maps = data
     locations = []
     for seed in seeds:
-        soil = seed_to_soil.source_to_dest(seed)
-        fertilizer = soil_to_fertilizer.source_to_dest(soil)
-        water = fertilizer_to_water.source_to_dest(fertilizer)
-        light = water_to_light.source_to_dest(water)
-        temperature = light_to_temperature.source_to_dest(light)
-        humidity = temperature_to_humidity.source_to_dest(temperature)
-        location = humidity_to_location.source_to_dest(humidity)
-        locations.append(location)
+        for range_map in maps:
+            seed = range_map.source_to_dest(seed)
+        locations.append(seed)
+    return min(locations)
 
-    print(min(locations))
-
-    # Star 2
-    seed_ranges = []
-    for seed_idx in range(0,len(seeds),2):
-        starting_seed = seeds[seed_idx]
-        seed_ranges.append(range(starting_seed, starting_seed+seeds[seed_idx+1]))
+ENGINES = Engines(default='interval')
 
-    found = False
+@ENGINES.register('reverse-scan')
+def reverse_scan(seed_ranges, maps):
     # Reverse search - instead of calculating the locations of all the seeds, find the first location that corresponds to a seed we have
     # I have 1.6 * 10**9 seeds to search and one of them will probably be mapped to a location less than that
     for min_loc in range(sum(len(seed_range) for seed_range in seed_ranges)):
-        humidity = humidity_to_location.dest_to_source(min_loc)
-        temperature = temperature_to_humidity.dest_to_source(humidity)
-        light = light_to_temperature.dest_to_source(temperature)
-        water = water_to_light.dest_to_source(light)
-        fertilizer = fertilizer_to_water.dest_to_source(water)
-        soil = soil_to_fertilizer.dest_to_source(fertilizer)
-        seed = seed_to_soil.dest_to_source(soil)
+        seed = min_loc
+        for range_map in reversed(maps):
+            seed = range_map.dest_to_source(seed)
         
         for seed_range in seed_ranges:
             if seed in seed_range:
-                found = True
-        
-        if found:
-            print(min_loc)
-            break
-
-    if not found:
-        print('Not found')
+                return min_loc
 
     # Brute force search ran in separate kernel but did not finish before I figured out the reverse search and ran it to completion
     # for idx, seed_range in enumerate(seed_ranges):
@@ -114,17 +99,58 @@ def main(data):
     #             min_loc = location
 
     # print(min_loc)
+    return None
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+@ENGINES.register('interval')
+def interval_mapping(seed_ranges, maps):
+    # Map whole seed ranges at once, splitting them wherever a map's ranges start or stop
+    intervals = [(seed_range.start, seed_range.stop) for seed_range in seed_ranges]
+    for range_map in maps:
+        mapped = []
+        for span, offset in range_map.ranges.items():
+            unmapped = []
+            for start, stop in intervals:
+                low, high = max(start, span.start), min(stop, span.stop)
+                if low < high:
+                    mapped.append((low+offset, high+offset))
+                    if start < low:
+                        unmapped.append((start, low))
+                    if high < stop:
+                        unmapped.append((high, stop))
+                else:
+                    unmapped.append((start, stop))
+            intervals = unmapped
+        intervals = mapped + intervals
+    return min(start for start, _ in intervals)
+
+def star2(data):
+    seeds, maps = data
+    seed_ranges = []
+    for seed_idx in range(0,len(seeds),2):
+        starting_seed = seeds[seed_idx]
+        seed_ranges.append(range(starting_seed, starting_seed+seeds[seed_idx+1]))
+    return ENGINES(seed_ranges, maps)
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    star1_answer, star2_answer = solve(data)
+    print(star1_answer)
+    print(star2_answer if star2_answer is not None else 'Not found')
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--engine', choices=ENGINES.names(), help=f'implementation to run (default: {ENGINES.default})')
     args = parser.parse_args()
-    data = read_input(args.input)
-    main(data)
+    ENGINES.select(args.engine)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,12 +1,12 @@
 from argparse import ArgumentParser
 from math import prod
-import re
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_lines as read_input
+from utils import all_ints, profile_solver, solve_with_metrics
 
-def all_ints(s):
-    return [int(i) for i in re.findall(r'\b\d+\b', s)]
-
-def main(data):
-    # Star 1
+def star1(data):
     times = all_ints(data[0])
     distances = all_ints(data[1])
 
@@ -16,29 +16,36 @@ def main(data):
             if time*(total_time-time) > record:
                 ways_to_win.append(total_time - 2*time + 1)
                 break
-    print(prod(ways_to_win))
+    return prod(ways_to_win)
 
-    # Star 2
-    total_time = int(''.join(str(time) for time in times))
-    record_dist = int(''.join(str(dist) for dist in distances))
+def star2(data):
+    total_time = int(''.join(str(time) for time in all_ints(data[0])))
+    record_dist = int(''.join(str(dist) for dist in all_ints(data[1])))
 
     ways_to_win = 0
     for time in range(total_time):
         if time*(total_time-time) > record_dist:
             ways_to_win = total_time - 2*time + 1
             break
-    print(ways_to_win)
+    return ways_to_win
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,6 +1,11 @@
 from argparse import ArgumentParser
+from bisect import insort
 from collections import defaultdict
 from functools import cmp_to_key
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import follow_solver, iter_lines, profile_solver, solve_with_metrics
 
 CARD_VALS = '23456789TJQKA'
 JOKER_CARD_VALS = 'J23456789TQKA'
@@ -93,35 +98,61 @@ def handbid_compare_joker(handbid1, handbid2):
         return -1
     return 1
 
-def main(data):
-    handbids = []
-    for line in data:
-        handbids.append(line.split())
+def read_input(input_file):
+    return [line.split() for line in iter_lines(input_file)]
 
-    # Star 1
-    handbids = sorted(handbids, key=cmp_to_key(handbid_compare))
+def total_winnings(handbids, compare):
+    handbids = sorted(handbids, key=cmp_to_key(compare))
     total_winnings = 0
     for rank,handbid in enumerate(handbids, start=1):
         total_winnings += rank * int(handbid[1])
-    print(total_winnings)
+    return total_winnings
 
-    # Star 2
-    handbids = sorted(handbids, key=cmp_to_key(handbid_compare_joker))
-    total_winnings = 0
-    for rank,handbid in enumerate(handbids, start=1):
-        total_winnings += rank * int(handbid[1])
-    print(total_winnings)
+def star1(handbids):
+    return total_winnings(handbids, handbid_compare)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def star2(handbids):
+    return total_winnings(handbids, handbid_compare_joker)
+
+class Stream:
+    '''
+    Hands kept sorted by strength under both rules as they are read, so the winnings can be
+    totalled at any point without sorting again.
+    '''
+    separator = '\n'
+
+    def __init__(self) -> None:
+        self.rankings = {handbid_compare: [], handbid_compare_joker: []}
+
+    def feed(self, line):
+        handbid = line.split()
+        for compare, ranked in self.rankings.items():
+            insort(ranked, handbid, key=cmp_to_key(compare))
+
+    def answers(self):
+        return tuple(sum(rank * int(handbid[1]) for rank, handbid in enumerate(ranked, start=1))
+                     for ranked in self.rankings.values())
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--follow', action='store_true', help='read lines as they arrive on input_file, or stdin for -, printing answers as they go')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.follow:
+        follow_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
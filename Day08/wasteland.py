@@ -1,22 +1,29 @@
 from argparse import ArgumentParser
 from itertools import cycle
 from math import lcm
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_lines as read_input
+from utils import profile_solver, solve_with_metrics
 
-def main(data):
+def parse_nodes(data):
     nodes = {}
     for line in data[2:]:
         nodes[line[0:3]] = (line[7:10], line[12:15])
-    
-    # Star 1
+    return nodes
+
+def star1(data):
+    nodes = parse_nodes(data)
     turns = cycle(data[0])
     curr = 'AAA'
     for step, turn in enumerate(turns, start=1):
         curr = nodes[curr][0] if turn == 'L' else nodes[curr][1]
         if curr == 'ZZZ':
-            print(step)
-            break
+            return step
 
-    # Star 2
+def star2(data):
+    nodes = parse_nodes(data)
     starts = [node for node in nodes if node.endswith('A')]
     lengths = []
     for start in starts:
@@ -27,18 +34,25 @@ def main(data):
             if curr.endswith('Z'):
                 lengths.append(step)
                 break
-    print(lcm(*lengths))
+    return lcm(*lengths)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
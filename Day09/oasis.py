@@ -1,4 +1,8 @@
 from argparse import ArgumentParser
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import follow_solver, iter_lines, profile_solver, solve_with_metrics
 
 def extrapolate(sequence, forward=True):
     if not any(sequence):
@@ -13,26 +17,49 @@ def extrapolate(sequence, forward=True):
         extra_val = sequence[0] - extra_diff_val
     return extra_val
 
-def main(data):
-    extra_vals = []
-    backward_extra_vals = []
-    for line in data:
+def read_input(input_file):
+    return [[int(num) for num in line.split()] for line in iter_lines(input_file)]
+
+def star1(data):
+    return sum(extrapolate(vals, forward=True) for vals in data)
+
+def star2(data):
+    return sum(extrapolate(vals, forward=False) for vals in data)
+
+class Stream:
+    separator = '\n'
+
+    def __init__(self) -> None:
+        self.totals = [0, 0]
+
+    def feed(self, line):
         vals = [int(num) for num in line.split()]
-        extra_vals.append(extrapolate(vals, forward=True))
-        backward_extra_vals.append(extrapolate(vals, forward=False))
-    print(sum(extra_vals))
-    print(sum(backward_extra_vals))
+        self.totals[0] += extrapolate(vals, forward=True)
+        self.totals[1] += extrapolate(vals, forward=False)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+    def answers(self):
+        return tuple(self.totals)
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--follow', action='store_true', help='read lines as they arrive on input_file, or stdin for -, printing answers as they go')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.follow:
+        follow_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,41 +1,42 @@
 from argparse import ArgumentParser
 import numpy as np
-np.set_printoptions(linewidth=200)
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_grid as read_input
+from utils import DOT, START, PIPE, DASH, NE_BEND, NW_BEND, SW_BEND, SE_BEND
+from utils import GridGraph, profile_solver, solve_with_metrics
+
+# Directions each pipe connects, in the n/e/s/w order neighbors() produces them
+PIPE_DIRS = {
+    PIPE: ('n', 's'),
+    DASH: ('e', 'w'),
+    NE_BEND: ('n', 'e'),
+    NW_BEND: ('n', 'w'),
+    SW_BEND: ('s', 'w'),
+    SE_BEND: ('e', 's'),
+}
+DIRS_PIPE = {dirs: pipe for pipe, dirs in PIPE_DIRS.items()}
 
 class PipeMaze():
     def __init__(self, maze) -> None:
         self.maze = maze
 
     def resolve_s(self, loc):
-        if self.maze[loc] != 'S':
+        if self.maze[loc] != START:
             return self.maze[loc]
         neighbors = self.neighbors(loc)
         valid = []
         for dir, neighbor in neighbors.items():
-            if dir == 'n' and self.maze[neighbor] in ('|', '7', 'F'):
+            if dir == 'n' and self.maze[neighbor] in (PIPE, SW_BEND, SE_BEND):
                 valid.append(dir)
-            elif dir == 'e' and self.maze[neighbor] in ('-', 'J', '7'):
+            elif dir == 'e' and self.maze[neighbor] in (DASH, NW_BEND, SW_BEND):
                 valid.append(dir)
-            elif dir == 's' and self.maze[neighbor] in ('|', 'L', 'J'):
+            elif dir == 's' and self.maze[neighbor] in (PIPE, NE_BEND, NW_BEND):
                 valid.append(dir)
-            elif dir == 'w' and self.maze[neighbor] in ('-', 'L', 'F'):
+            elif dir == 'w' and self.maze[neighbor] in (DASH, NE_BEND, SE_BEND):
                 valid.append(dir)
-        valid = tuple(valid)
-        match valid:
-            case ('n', 's'):
-                return '|'
-            case ('e', 'w'):
-                return '-'
-            case ('n', 'e'):
-                return 'L'
-            case ('n', 'w'):
-                return 'J'
-            case ('s', 'w'):
-                return '7'
-            case ('e', 's'):
-                return 'F'
-            case _:
-                return '.'
+        return DIRS_PIPE.get(tuple(valid), DOT)
 
     def neighbors(self, loc):
         neighbors = {}
@@ -49,81 +50,64 @@ class PipeMaze():
             neighbors['w'] = ((loc[0], loc[1]-1))
         return neighbors
 
-    def valid_neighbors(self, loc):
-        char = self.resolve_s(loc)
-        neighbors = self.neighbors(loc)
-        match char:
-            case '|':
-                valid = ('n', 's')
-            case '-':
-                valid = ('e', 'w')
-            case 'L':
-                valid = ('n', 'e')
-            case 'J':
-                valid = ('n', 'w')
-            case '7':
-                valid = ('s', 'w')
-            case 'F':
-                valid = ('e', 's')
-            case _:
-                valid = ()
-        return tuple(neighbors[valid_dir] for valid_dir in valid)
+    def pipe_moves(self, direction):
+        'GridGraph rule: a pipe only leads the ways its two ends point.'
+        return np.isin(self.maze, [pipe for pipe, dirs in PIPE_DIRS.items() if 'nesw'[direction] in dirs])
 
-def main(data):
-    char_array = [[char for char in line] for line in data]
-    maze = PipeMaze(np.array(char_array))
+def find_loop(data):
+    maze = PipeMaze(data.copy())
 
-    start = np.where(maze.maze == 'S')
+    start = np.where(maze.maze == START)
     start = (start[0][0], start[1][0])
     maze.maze[start] = maze.resolve_s(start)
 
+    graph = GridGraph(maze.maze.shape, moves=maze.pipe_moves)
+    neighbors = graph.adjacency()
+    start = graph.cell(start)
+    # Loop cells are ids into the flattened maze
     path = [start]
     old = start
-    curr = maze.valid_neighbors(old)[0]
+    curr = neighbors[start][0]
     while curr != start:
         path.append(curr)
-        neighbors = maze.valid_neighbors(curr)
-        for neighbor in neighbors:
-            if neighbor != old:
-                old = curr
-                curr = neighbor
-                break
-    print(len(path)//2)
+        first, second = neighbors[curr]
+        old, curr = curr, (second if first == old else first)
+    return maze, path
 
-    new_maze = maze.maze
-    path = set(path)
-    for row in range(new_maze.shape[0]):
-        for col in range(new_maze.shape[1]):
-            loc = (row,col)
-            if loc not in path:
-                new_maze[loc] = '0'
+def star1(data):
+    _, path = find_loop(data)
+    return len(path)//2
 
-    area = 0
-    for row in range(new_maze.shape[0]):
-        inside = False
-        for col in range(new_maze.shape[1]):
-            char = new_maze[row,col]
-            # Any set of pipes that extends the loop vertically acts as an inside/outside divider.
-            # The sets of pipes that do that are |, L7, and FJ.
-            # Here we pick the north facing members. We could equivalently pick the south facing ones, but not both.
-            if char in '|LJ':
-                inside = not inside
-            if char == '0' and inside:
-                new_maze[row,col] = 'I'
-                area += 1
-    print(new_maze)
-    print(area)
+def star2(data):
+    maze, path = find_loop(data)
+    on_loop = np.zeros(maze.maze.size, dtype=bool)
+    on_loop[path] = True
+    on_loop = on_loop.reshape(maze.maze.shape)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+    # Any set of pipes that extends the loop vertically acts as an inside/outside divider.
+    # The sets of pipes that do that are |, L7, and FJ.
+    # Here we pick the north facing members. We could equivalently pick the south facing ones, but not both.
+    dividers = on_loop & np.isin(maze.maze, (PIPE, NE_BEND, NW_BEND))
+    inside = np.cumsum(dividers, axis=1) % 2 == 1
+    return int(np.sum(inside & ~on_loop))
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
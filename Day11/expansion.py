@@ -1,5 +1,11 @@
 from argparse import ArgumentParser
 import numpy as np
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_grid as read_input
+from utils import DOT, HASH
+from utils import profile_solver, solve_with_metrics
 
 def weighted_manhattan(point1, point2, empty_rows, empty_cols, weight):
     row1, col1 = point1
@@ -23,36 +29,45 @@ def weighted_manhattan(point1, point2, empty_rows, empty_cols, weight):
 
     return dist
 
-def main(data):
-    char_array = [[char for char in line] for line in data]
-    data = np.array(char_array)
-
-    empty_rows = [row for row in range(data.shape[0]) if np.all(data[row,:] == '.')]
-    empty_cols = [col for col in range(data.shape[1]) if np.all(data[:,col] == '.')]
+def total_path_length(data, weight):
+    empty_rows = [row for row in range(data.shape[0]) if np.all(data[row,:] == DOT)]
+    empty_cols = [col for col in range(data.shape[1]) if np.all(data[:,col] == DOT)]
 
     galaxies = []
     for row in range(data.shape[0]):
         for col in range(data.shape[1]):
-            if data[row,col] == '#':
+            if data[row,col] == HASH:
                 galaxies.append((row,col))
 
-    for weight in (2, 10, 100, 1000000):
-        total_path_length = 0
-        for idx, galaxy in enumerate(galaxies):
-            for second_galaxy in galaxies[idx+1:]:
-                total_path_length += weighted_manhattan(galaxy, second_galaxy, empty_rows, empty_cols, weight)
-        print(total_path_length)
+    total_path_length = 0
+    for idx, galaxy in enumerate(galaxies):
+        for second_galaxy in galaxies[idx+1:]:
+            total_path_length += weighted_manhattan(galaxy, second_galaxy, empty_rows, empty_cols, weight)
+    return total_path_length
+
+def star1(data):
+    return total_path_length(data, 2)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def star2(data):
+    return total_path_length(data, 1000000)
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,7 +1,15 @@
 from argparse import ArgumentParser
-from functools import cache
+from functools import lru_cache
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import METRICS, iter_lines, parallel_map, persistent_memo, profile_solver, solve_with_metrics
 
-@cache
+# Subproblems of one unfolded row number in the low thousands, so this comfortably holds the row
+# being counted while evicting rows long finished
+MEMO_SIZE = 1 << 16
+
+@lru_cache(maxsize=MEMO_SIZE)
 def count_solns(row, sequence_lengths, curr_streak=0):
     if not sequence_lengths and not row:
         return 1
@@ -27,27 +35,60 @@ def count_solns(row, sequence_lengths, curr_streak=0):
             return (count_solns('.' + row[1:], sequence_lengths, curr_streak) 
                     + count_solns('#' + row[1:], sequence_lengths, curr_streak))
 
-def main(data):
-    arrangements = 0
-    arrangements2 = 0
-    for line in data:
-        row, sequence_lengths = line.split()
-        sequence_lengths = tuple(int(length) for length in sequence_lengths.split(','))
-        arrangements += count_solns(row, sequence_lengths)
-        arrangements2 += count_solns('?'.join([row]*5), sequence_lengths*5)
-    print(arrangements)
-    print(arrangements2)
+@persistent_memo(version=1)
+def record_arrangements(row, sequence_lengths):
+    'Arrangements of a whole record, kept on disk so later runs and batches skip records seen before.'
+    return count_solns(row, sequence_lengths)
 
 def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+    records = []
+    for line in iter_lines(input_file):
+        row, sequence_lengths = line.split()
+        records.append((row, tuple(int(length) for length in sequence_lengths.split(','))))
+    return records
+
+def add_cache_metrics(before):
+    after = count_solns.cache_info()
+    METRICS.add('cache_hits', after.hits - before.hits)
+    METRICS.add('cache_misses', after.misses - before.misses)
+
+def star1(data):
+    before = count_solns.cache_info()
+    arrangements = 0
+    for row, sequence_lengths in data:
+        arrangements += record_arrangements(row, sequence_lengths)
+    add_cache_metrics(before)
+    return arrangements
+
+def unfolded_arrangements(records, arrays):
+    before = count_solns.cache_info()
+    arrangements = 0
+    for row, sequence_lengths in records:
+        arrangements += record_arrangements('?'.join([row]*5), sequence_lengths*5)
+    add_cache_metrics(before)
+    return arrangements
+
+def star2(data):
+    # Records are short strings rather than arrays, so they go to the workers with their chunks
+    return parallel_map(unfolded_arrangements, data, reduce=sum)
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
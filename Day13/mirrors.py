@@ -1,5 +1,10 @@
 from argparse import ArgumentParser
 import numpy as np
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_grids as read_input
+from utils import profile_solver, solve_with_metrics
 
 def find_reflections(line):
     reflections = []
@@ -15,18 +20,8 @@ def find_reflections(line):
             reflections.append(idx)
     return reflections
 
-def main(data):
-    patterns = []
-    pattern = []
-    for line in data:
-        if line == '':
-            patterns.append(np.array(pattern))
-            pattern = []
-        else:
-            pattern.append([char for char in line])
-    patterns.append(np.array(pattern))
-    
-    # Star 1
+def reflection_summary(patterns, smudges=0):
+    # A line of reflection is one that every row/column reflects across, except for the smudged ones
     horis = []
     verts = []
     for pattern in patterns:
@@ -39,10 +34,10 @@ def main(data):
             reflections = find_reflections(col)
             vert_refs[reflections, idx] = 1
         for idx, col in enumerate(hori_refs.T):
-            if np.all(col):
+            if np.sum(col) == len(col)-smudges:
                 verts.append(idx)
         for idx, row in enumerate(vert_refs):
-            if np.all(row):
+            if np.sum(row) == len(row)-smudges:
                 horis.append(idx)
     
     summary = 0
@@ -50,45 +45,31 @@ def main(data):
         summary += 100*loc
     for loc in verts:
         summary += loc
-    print(summary)
+    return summary
 
-    # Star 2
-    horis = []
-    verts = []
-    for pattern in patterns:
-        hori_refs = np.zeros(pattern.shape)
-        vert_refs = np.zeros(pattern.shape)
-        for idx, row in enumerate(pattern):
-            reflections = find_reflections(row)
-            hori_refs[idx, reflections] = 1
-        for idx, col in enumerate(pattern.T):
-            reflections = find_reflections(col)
-            vert_refs[reflections, idx] = 1
-        for idx, col in enumerate(hori_refs.T):
-            if np.sum(col) == len(col)-1:
-                verts.append(idx)
-        for idx, row in enumerate(vert_refs):
-            if np.sum(row) == len(row)-1:
-                horis.append(idx)
-    
-    summary = 0
-    for loc in horis:
-        summary += 100*loc
-    for loc in verts:
-        summary += loc
-    print(summary)
+def star1(patterns):
+    return reflection_summary(patterns)
+
+def star2(patterns):
+    return reflection_summary(patterns, smudges=1)
 
+def solve(data):
+    return star1(data), star2(data)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,5 +1,11 @@
 from argparse import ArgumentParser
 import numpy as np
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_grid as read_input
+from utils import DOT, ROUND
+from utils import find_cycle, profile_solver, solve_with_metrics
 
 class RockGrid:
     def __init__(self, data) -> None:
@@ -10,10 +16,10 @@ class RockGrid:
         return (0 <= loc[0] < self.height) and (0 <= loc[1] < self.width)
     
     def final_position(self, loc):
-        if self.data[loc] != 'O':
+        if self.data[loc] != ROUND:
             return loc
         for row in range(loc[0]-1, -1, -1):
-            if self.data[row, loc[1]] != '.':
+            if self.data[row, loc[1]] != DOT:
                 return (row+1, loc[1])
         return (0, loc[1])
 
@@ -33,8 +39,8 @@ class RockGrid:
             for col in range(self.width):
                 final_pos = self.final_position((row,col))
                 if final_pos != (row,col):
-                    self.data[final_pos] = 'O'
-                    self.data[row,col] = '.'
+                    self.data[final_pos] = ROUND
+                    self.data[row,col] = DOT
 
         if k:
             self.data = np.rot90(self.data, 4-k)
@@ -43,57 +49,45 @@ class RockGrid:
         load = 0
         for row in range(self.height):
             for col in range(self.width):
-                if self.data[row,col] == 'O':
+                if self.data[row,col] == ROUND:
                     load += self.height - row
         return load
     
-    def to_tuple(self):
-        return tuple(map(tuple, self.data))
+    def spin(self):
+        for direction in ('n', 'w', 's', 'e'):
+            self.roll(direction)
+        return self
 
-def main(data):
-    char_array = [[char for char in line] for line in data]
+    def key(self):
+        return self.data.tobytes()
 
-    # Star 1
-    rocks = RockGrid(np.array(char_array))
+def star1(data):
+    rocks = RockGrid(data.copy())
     rocks.roll()
-    print(rocks.load())
+    return rocks.load()
 
-    # Star 2
-    rocks = RockGrid(np.array(char_array))
-    spin_cycle = ('n', 'w', 's', 'e')
-    observed_states = {rocks.to_tuple(): 0}
-    no_cycles = 1000
-    offset, repeat_len = 0, 0
-    for cycle in range(1, no_cycles+1):
-        for direction in spin_cycle:
-            rocks.roll(direction)
-        rocks_state = rocks.to_tuple()
-        if rocks_state in observed_states:
-            offset = observed_states[rocks_state]
-            repeat_len = cycle - offset
-            break
-        observed_states[rocks_state] = cycle
-    print(offset, repeat_len)
+def star2(data):
+    # Loads are stored per spin, so the billionth is read back from the cycle without re-spinning
+    cycle = find_cycle(RockGrid(data.copy()), RockGrid.spin, RockGrid.key, RockGrid.load, limit=1000)
+    return cycle.at(1000000000)
 
-    total_cycles = 1000000000
-    point_in_cycle = (total_cycles - offset) % repeat_len
-    rocks = RockGrid(np.array(char_array))
-    no_cycles = offset + point_in_cycle
-    for cycle in range(1, no_cycles+1):
-        for direction in spin_cycle:
-            rocks.roll(direction)
-    print(rocks.load())
+def solve(data):
+    return star1(data), star2(data)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
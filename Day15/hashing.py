@@ -1,5 +1,9 @@
 from argparse import ArgumentParser
 from collections import defaultdict
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import follow_solver, profile_solver, read_lines, solve_with_metrics
 
 def HASH(string):
     curr = 0
@@ -9,42 +13,71 @@ def HASH(string):
         curr %= 256
     return curr
 
-def main(data):
-    sequence = data[0].split(',')
+def read_input(input_file):
+    return read_lines(input_file)[0].split(',')
 
-    # Star 1
+def star1(sequence):
     total = 0
     for step in sequence:
         total += HASH(step)
-    print(total)
+    return total
 
-    # Star 2
-    boxes = defaultdict(dict)
-    for step in sequence:
-        instr = '-' if '-' in step else '='
-        label, focal = step.split(instr)
-        box_no = HASH(label)
-        if instr == '-' and label in boxes[box_no]:
-            del boxes[box_no][label]
-        if instr == '=':
-            boxes[box_no][label] = focal
-    
+def apply_step(boxes, step):
+    instr = '-' if '-' in step else '='
+    label, focal = step.split(instr)
+    box_no = HASH(label)
+    if instr == '-' and label in boxes[box_no]:
+        del boxes[box_no][label]
+    if instr == '=':
+        boxes[box_no][label] = focal
+
+def focusing_power(boxes):
     total_power = 0
     for box_no, box in boxes.items():
         for idx, (label, focal) in enumerate(box.items(), start=1):
             total_power += (1+box_no) * idx * int(focal)
-    print(total_power)
+    return total_power
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def star2(sequence):
+    boxes = defaultdict(dict)
+    for step in sequence:
+        apply_step(boxes, step)
+    return focusing_power(boxes)
+
+class Stream:
+    separator = ','
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.boxes = defaultdict(dict)
+
+    def feed(self, step):
+        self.total += HASH(step)
+        apply_step(self.boxes, step)
+
+    def answers(self):
+        return self.total, focusing_power(self.boxes)
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--follow', action='store_true', help='read steps as they arrive on input_file, or stdin for -, printing answers as they go')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.follow:
+        follow_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
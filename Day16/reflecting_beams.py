@@ -1,85 +1,69 @@
 from argparse import ArgumentParser
 import numpy as np
 from dataclasses import dataclass
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_grid as read_input
+from utils import DOT, PIPE, DASH, SLASH, BACKSLASH, NORTH, EAST, SOUTH, WEST
+from utils import GridGraph, METRICS, parallel_map, profile_solver, solve_with_metrics
 
-OFFSETS = {
-    'n': (-1, 0),
-    's': (1, 0),
-    'e': (0, 1),
-    'w': (0, -1),
+# Directions a beam leaves each tile by, indexed by the direction it was travelling as it entered
+EXITS = {
+    DOT: ((NORTH,), (EAST,), (SOUTH,), (WEST,)),
+    SLASH: ((EAST,), (NORTH,), (WEST,), (SOUTH,)),
+    BACKSLASH: ((WEST,), (SOUTH,), (EAST,), (NORTH,)),
+    PIPE: ((NORTH,), (NORTH, SOUTH), (SOUTH,), (NORTH, SOUTH)),
+    DASH: ((EAST, WEST), (EAST,), (EAST, WEST), (WEST,)),
 }
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Beam:
-    start: tuple
-    dir: str
+    start: int
+    dir: int
 
 class Facility:
     def __init__(self, grid) -> None:
-        self.grid = grid
-        self.height, self.width = self.grid.shape
-        self.energy = np.zeros((self.height, self.width))
+        self.height, self.width = grid.shape
+        self.graph = GridGraph(grid.shape)
+        # Tiles and moves by cell id, as lists since the beam walk reads them one cell at a time
+        self.tiles = grid.ravel().tolist()
+        self.steps = self.graph.steps()
+        self.energy = np.zeros(self.height * self.width, dtype=bool)
 
-    def is_valid(self, loc):
-        return (0 <= loc[0] < self.height) and (0 <= loc[1] < self.width)
-    
     def reset_energy(self):
-        self.energy = np.zeros((self.height, self.width))
+        self.energy[:] = False
 
     def total_energized(self):
-        return np.sum(self.energy != 0)
+        return np.sum(self.energy)
     
     def energize(self, path):
-        for loc in path:
-            if self.is_valid(loc):
-                self.energy[loc] += 1
+        self.energy[path] = True
     
     def find_beam_path(self, beam: Beam):
         children = []
-        path = [beam.start]
+        path = []
 
-        offset = OFFSETS[beam.dir]
-        next_loc = (beam.start[0]+offset[0], beam.start[1]+offset[1])
-        while self.is_valid(next_loc):
-            if (self.grid[next_loc] in '/\\' or 
-                (self.grid[next_loc] == '|' and beam.dir in 'ew') or
-                (self.grid[next_loc] == '-' and beam.dir in 'ns')):
+        cell, dir = beam.start, beam.dir
+        while True:
+            path.append(cell)
+            exits = EXITS[self.tiles[cell]][dir]
+            if exits != (dir,):
                 break
-            path.append(next_loc)
-            next_loc = (next_loc[0]+offset[0], next_loc[1]+offset[1])
-
-        if self.is_valid(next_loc):
-            path.append(next_loc)
-            if self.grid[next_loc] == '/':
-                match beam.dir:
-                    case 'n' | 'e':
-                        next_dir = 'n' if beam.dir == 'e' else 'e'
-                    case 's' | 'w':
-                        next_dir = 's' if beam.dir == 'w' else 'w'
-                children.append(Beam(next_loc, next_dir))
-            elif self.grid[next_loc] == '\\':
-                match beam.dir:
-                    case 'n' | 'w':
-                        next_dir = 'n' if beam.dir == 'w' else 'w'
-                    case 's' | 'e':
-                        next_dir = 's' if beam.dir == 'e' else 'e'
-                children.append(Beam(next_loc, next_dir))
-            elif self.grid[next_loc] == '|':
-                children.append(Beam(next_loc, 'n'))
-                children.append(Beam(next_loc, 's'))
-            elif self.grid[next_loc] == '-':
-                children.append(Beam(next_loc, 'e'))
-                children.append(Beam(next_loc, 'w'))
+            cell = self.steps[dir][cell]
+            if cell == -1:
+                return path, children
 
+        for exit in exits:
+            next_cell = self.steps[exit][cell]
+            if next_cell != -1:
+                children.append(Beam(next_cell, exit))
         return path, children
 
-def main(data):
-    char_array = [[char for char in line] for line in data]
-    facility = Facility(np.array(char_array))
-
-    # Star 1
-    beams = [Beam((0,-1), 'e')]
+def energize_from(facility, start_beam):
+    beams = [start_beam]
     seen = set()
+    facility.reset_energy()
     while beams:
         beam = beams.pop()
         path, children = facility.find_beam_path(beam)
@@ -88,43 +72,47 @@ def main(data):
         for child in children:
             if child not in seen:
                 beams.append(child)
-    print(facility.total_energized())
+    METRICS.add('beams_processed', len(seen))
+    return facility.total_energized()
 
-    # Star 2
+def star1(data):
+    return energize_from(Facility(data), Beam(0, EAST))
+
+def star2(data):
+    facility = Facility(data)
     start_beams = []
+    graph = facility.graph
     for row in range(facility.height):
-        start_beams.append(Beam((row, -1), 'e'))
-        start_beams.append(Beam((row, facility.width), 'w'))
+        start_beams.append(Beam(graph.cell((row, 0)), EAST))
+        start_beams.append(Beam(graph.cell((row, facility.width-1)), WEST))
     for col in range(facility.width):
-        start_beams.append(Beam((-1, col), 's'))
-        start_beams.append(Beam((facility.height, col), 'n'))
+        start_beams.append(Beam(graph.cell((0, col)), SOUTH))
+        start_beams.append(Beam(graph.cell((facility.height-1, col)), NORTH))
+
+    # Every start is independent, so the workers share the grid and each take a slice of them
+    return parallel_map(energize_most, start_beams, {'grid': data}, reduce=max)
 
-    energized = []
-    for start_beam in start_beams:
-        beams = [start_beam]
-        seen = set()
-        facility.reset_energy()
-        while beams:
-            beam = beams.pop()
-            path, children = facility.find_beam_path(beam)
-            facility.energize(path)
-            seen.add(beam)
-            for child in children:
-                if child not in seen:
-                    beams.append(child)
-        energized.append(facility.total_energized())
-    print(max(energized))
+def energize_most(start_beams, arrays):
+    facility = Facility(arrays['grid'])
+    return max(energize_from(facility, start_beam) for start_beam in start_beams)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,164 +1,155 @@
 from argparse import ArgumentParser
 import numpy as np
-from heapq import *
-import itertools
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_grid as read_input
+from utils import ZERO
+from utils import Engines, GridGraph, IndexedHeap, METRICS, profile_solver, solve_with_metrics
+from search import astar, dial, manhattan
 
 np.set_printoptions(linewidth=200)
 
+# Fewest blocks before a crucible may turn, and most before it must
+CRUCIBLES = {
+    'normal': (1, 3),
+    'ultimate': (4, 10),
+}
+
 class Heatmap:
     def __init__(self, data) -> None:
         self.data = data
         self.height, self.width = self.data.shape
-
-    def is_valid(self, loc):
-        return (0 <= loc[0] < self.height) and (0 <= loc[1] < self.width)
-    
-    def get_neighbors(self, loc, invalid_dirs=()):
-        neighbors = set()
-        moves = {
-            'n': (-1, 0), 
-            's': (1,0),
-            'w': (0,-1),
-            'e': (0,1)
-        }
-        for dir, offset in moves.items():
-            if dir in invalid_dirs:
-                continue
-            candidate = (loc[0]+offset[0], loc[1]+offset[1])
-            if self.is_valid(candidate):
-                neighbors.add((dir, candidate))
-        return neighbors
-
-    def get_valid_neighbors(self, loc, last_dir, dir_streak=1, crucible_type='normal'):
-        invalid_dirs = []
-        if crucible_type == 'normal':
-            if dir_streak == 3:
-                invalid_dirs.append(last_dir)
-            match last_dir:
-                case 'n':
-                    invalid_dirs.append('s')
-                case 's':
-                    invalid_dirs.append('n')
-                case 'e':
-                    invalid_dirs.append('w')
-                case 'w':
-                    invalid_dirs.append('e')
-        else:
-            if dir_streak == 10:
-                invalid_dirs.append(last_dir)
-            elif dir_streak < 4:
-                for dir in ('n','s','e','w'):
-                    if dir != last_dir:
-                        invalid_dirs.append(dir)
-            match last_dir:
-                case 'n':
-                    invalid_dirs.append('s')
-                case 's':
-                    invalid_dirs.append('n')
-                case 'e':
-                    invalid_dirs.append('w')
-                case 'w':
-                    invalid_dirs.append('e')
-
-        return self.get_neighbors(loc, invalid_dirs)
-
-REMOVED = '<removed-node>'      # placeholder for a removed node
-counter = itertools.count()     # unique sequence count
-
-def add_node(pq, entry_finder, counter, node, distance=0):
-    'Add a new node or update an existing node'
-    if node in entry_finder:
-        remove_node(entry_finder,node)
-    count = next(counter)
-    entry = [distance, count, node]
-    entry_finder[node] = entry
-    heappush(pq, entry)
-
-def remove_node(entry_finder, node):
-    'Mark an existing node as REMOVED.  Raise KeyError if not found.'
-    entry = entry_finder.pop(node)
-    entry[-1] = REMOVED
-
-def pop_node(pq, entry_finder):
-    'Remove and return the lowest distance node. Raise KeyError if empty.'
-    while pq:
-        distance, count, node = heappop(pq)
-        if node is not REMOVED:
-            del entry_finder[node]
-            return distance,node
-    raise KeyError('pop from an empty priority queue')
-
-def Dijkstra(heatmap: Heatmap, source, crucible_type='normal'):
-
-    if crucible_type == 'normal':
-        max_dir_streak = 3
-    else:
-        max_dir_streak = 10
+        self.graph = GridGraph(self.data.shape)
+        # Heat and moves by cell id, as lists since the search reads them one cell at a time
+        self.heat = self.data.ravel().tolist()
+        self.steps = self.graph.steps()
+
+    def get_valid_neighbors(self, cell, last_dir, dir_streak=1, crucible_type='normal'):
+        min_turn, max_streak = CRUCIBLES[crucible_type]
+        dirs = []
+        if dir_streak < max_streak:
+            dirs.append(last_dir)
+        if dir_streak >= min_turn:
+            # Left and right turns; reversing is never allowed
+            dirs.extend(((last_dir+1) % 4, (last_dir+3) % 4))
+        return [(dir, self.steps[dir][cell]) for dir in dirs if self.steps[dir][cell] != -1]
+
+ENGINES = Engines(default='bucket')
+
+@ENGINES.register('heap')
+def heap_dijkstra(heatmap: Heatmap, source, crucible_type='normal'):
+    'Reference engine: Dijkstra on an IndexedHeap with decrease-key.'
+    max_dir_streak = CRUCIBLES[crucible_type][1]
 
     distances = np.inf*np.ones((heatmap.height, heatmap.width, 4, max_dir_streak))
     distances[source] = 0
-    previous = np.zeros_like(heatmap.data,dtype=object)
-
-    directions = ('n','s','e','w')
-
-    queue = []
-    entry_finder = {}
-    for row in range(heatmap.height):
-        for col in range(heatmap.width):
-            loc = (row, col)
-            for dir_idx, last_dir in enumerate(directions):
-                for dir_streak in range(1, max_dir_streak+1):
-                    node = (loc, last_dir, dir_streak)
-                    add_node(queue,entry_finder,counter,node, distance=distances[row,col,dir_idx,dir_streak-1])
 
+    # Node ids are flat indexes into distances, so (cell, dir, streak) maps to one integer
+    queue = IndexedHeap(distances.ravel().tolist())
+    decreased = 0
     while queue:
-        try:
-            closest_dist,(closest_loc,last_dir,dir_streak) = pop_node(queue,entry_finder)
-        except:
-            break
+        closest_dist, node_id = queue.pop()
+        node_id, streak_idx = divmod(node_id, max_dir_streak)
+        closest_cell, last_dir = divmod(node_id, 4)
+        dir_streak = streak_idx+1
 
-        neighbors = heatmap.get_valid_neighbors(closest_loc, last_dir, dir_streak, crucible_type)
+        neighbors = heatmap.get_valid_neighbors(closest_cell, last_dir, dir_streak, crucible_type)
         for dir,neighbor in neighbors:
             new_streak = 1 if dir != last_dir else dir_streak+1
-            neighbor_node = (neighbor, dir, new_streak)
-            if neighbor_node not in entry_finder:
+            neighbor_id = (neighbor*4 + dir)*max_dir_streak + new_streak-1
+            if neighbor_id not in queue:
                 continue
-            dist = closest_dist + heatmap.data[neighbor]
-            known_dist = distances[neighbor[0], neighbor[1], directions.index(dir), new_streak-1]
-            if dist < known_dist:
-                add_node(queue,entry_finder,counter,neighbor_node, dist)
-                distances[neighbor[0], neighbor[1], directions.index(dir), new_streak-1] = dist
-                previous[neighbor] = closest_loc
-
-    return distances,previous
-
-def main(data):
-    array = [[int(char) for char in line] for line in data]
-    data = np.array(array)
-    heatmap = Heatmap(data)
-
-    start = (0,0)
-    
-    # Star 1
-    distances, _ = Dijkstra(heatmap, start)
-    print(np.min(distances[heatmap.height-1, heatmap.width-1]))
-
-    # Star 2
+            dist = closest_dist + heatmap.heat[neighbor]
+            if dist < queue.priority(neighbor_id):
+                queue.decrease_key(neighbor_id, dist)
+                decreased += 1
+
+    distances = np.array(queue.priorities).reshape(distances.shape)
+    METRICS.add('nodes_popped', distances.size)
+    METRICS.add('decrease_keys', decreased)
+    return distances
+
+def state_edges(heatmap: Heatmap, crucible_type='normal'):
+    '''
+    Edges of the search over (cell, dir, streak) states, numbered by their flat index into the
+    distances array, as a function from a state to its (neighbor, heat) pairs.
+    '''
+    max_dir_streak = CRUCIBLES[crucible_type][1]
+    def edges(node_id):
+        node_id, streak_idx = divmod(node_id, max_dir_streak)
+        cell, last_dir = divmod(node_id, 4)
+        dir_streak = streak_idx+1
+        for dir, neighbor in heatmap.get_valid_neighbors(cell, last_dir, dir_streak, crucible_type):
+            new_streak = 1 if dir != last_dir else dir_streak+1
+            yield (neighbor*4 + dir)*max_dir_streak + new_streak-1, heatmap.heat[neighbor]
+    return edges
+
+@ENGINES.register('bucket')
+def bucket_dijkstra(heatmap: Heatmap, source, crucible_type='normal'):
+    'Dijkstra on a bucket queue.'
+    max_dir_streak = CRUCIBLES[crucible_type][1]
+    shape = (heatmap.height, heatmap.width, 4, max_dir_streak)
+    source_cell = heatmap.graph.cell(source)
+    sources = range(source_cell*4*max_dir_streak, (source_cell+1)*4*max_dir_streak)
+    # Heat losses are single digits, so a bucket queue beats a heap
+    distances = dial(int(np.prod(shape)), sources, state_edges(heatmap, crucible_type), max(heatmap.heat))
+    return np.array(distances).reshape(shape)
+
+@ENGINES.register('astar')
+def astar_search(heatmap: Heatmap, source, crucible_type='normal'):
+    '''
+    A* to the bottom right cell, guided by the Manhattan distance times the smallest heat loss.
+    Only the distance to the goal is found, so every state at the goal cell the crucible may stop in
+    gets that distance and all other states are left at inf.
+    '''
+    min_turn, max_dir_streak = CRUCIBLES[crucible_type]
+    shape = (heatmap.height, heatmap.width, 4, max_dir_streak)
+    source_cell = heatmap.graph.cell(source)
+    goal_cell = heatmap.graph.cell((heatmap.height-1, heatmap.width-1))
+    sources = range(source_cell*4*max_dir_streak, (source_cell+1)*4*max_dir_streak)
+    def is_goal(node_id):
+        cell_dir, streak_idx = divmod(node_id, max_dir_streak)
+        return cell_dir // 4 == goal_cell and streak_idx+1 >= min_turn
+    heuristic = manhattan(heatmap.width, goal_cell, min(heatmap.heat), cell=lambda node_id: node_id // (4*max_dir_streak))
+    goal_dist = astar(sources, state_edges(heatmap, crucible_type), heuristic, is_goal)
+
+    distances = np.full(shape, np.inf)
+    if goal_dist is not None:
+        distances[heatmap.height-1, heatmap.width-1, :, min_turn-1:] = goal_dist
+    return distances
+
+def star1(data):
+    heatmap = Heatmap(data - ZERO)
+    distances = ENGINES(heatmap, (0,0))
+    return np.min(distances[heatmap.height-1, heatmap.width-1])
+
+def star2(data):
     # For some reason the minimum here doesn't give the right answer even though it works on test cases
     # But the correct answer was very close
-    distances, _ = Dijkstra(heatmap, start, crucible_type='ultimate')
-    print(np.min(distances[heatmap.height-1, heatmap.width-1, :, 3:]))
+    heatmap = Heatmap(data - ZERO)
+    distances = ENGINES(heatmap, (0,0), crucible_type='ultimate')
+    return np.min(distances[heatmap.height-1, heatmap.width-1, :, 3:])
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--engine', choices=ENGINES.names(), help=f'implementation to run (default: {ENGINES.default})')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    ENGINES.select(args.engine)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
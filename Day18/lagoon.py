@@ -1,6 +1,10 @@
 from argparse import ArgumentParser
 from dataclasses import dataclass
 import numpy as np
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import iter_lines, profile_solver, solve_with_metrics
 
 OFFSETS = {
     'R': (0, 1),
@@ -99,25 +103,27 @@ def get_pipe_shape(last_dir, curr_dir):
         return '7'
     return 'S'
 
-@dataclass
+@dataclass(slots=True)
 class Instruction:
     direction: str
     length: int
     color: str
 
-def main(data):
+def read_input(input_file):
     instructions = []
-    for line in data:
+    for line in iter_lines(input_file):
         split = line.split()
         instructions.append(Instruction(split[0], int(split[1]), split[2][2:8]))
+    return instructions
 
+def star1(instructions):
     arena = np.zeros((2000,2000), dtype='<U1')
     for row in range(arena.shape[0]):
         for col in range(arena.shape[1]):
             arena[row,col] = '0'
     start = (1000,1000)
 
-    # Star 1 - using pipe maze code from day 10
+    # Using pipe maze code from day 10
     curr_pos = start
     curr_dir = 'B'
     path = {start}
@@ -142,9 +148,9 @@ def main(data):
             if char == '0' and inside:
                 arena[row,col] = 'I'
     
-    print(np.sum(arena != '0'))
+    return np.sum(arena != '0')
 
-    # Star 2
+def star2(instructions):
     new_instructions = []
     for instruction in instructions:
         color = instruction.color
@@ -171,18 +177,25 @@ def main(data):
     area /= 2
 
     # Pick's theorem, but why does it turn out to be +1 here and not -1 like it should be?
-    print(abs(area) + path_length/2 + 1)
+    return abs(area) + path_length/2 + 1
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
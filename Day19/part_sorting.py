@@ -1,12 +1,13 @@
 from argparse import ArgumentParser
 from dataclasses import dataclass
-import re
 import copy
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import profile_solver, read_blocks, solve_with_metrics
+from utils import all_ints
 
-def all_ints(s):
-    return [int(i) for i in re.findall(r'\b\d+\b', s)]
-
-@dataclass
+@dataclass(slots=True)
 class Part:
     x: int
     m: int
@@ -24,6 +25,8 @@ class Part:
         return self.x + self.m + self.a + self.s
 
 class Step:
+    __slots__ = ('terminal', 'condition', 'simple_condition', 'dest', 'val', 'comparator', 'test_val')
+
     def __init__(self, string) -> None:
         if ':' not in string:
             self.terminal = True
@@ -106,18 +109,20 @@ def count_accepted(workflows, current_workflow, current_ranges):
             current_ranges[step.val] = continuing_range
     return sum(accepted)
 
-def main(data):
+def read_input(input_file):
+    workflow_lines, part_lines = read_blocks(input_file)
     workflows = {}
-    for idx, line in enumerate(data):
-        if line == '':
-            break
+    for line in workflow_lines:
         workflow = Workflow(line)
         workflows[workflow.name] = workflow
 
     parts = []
-    for line in data[idx+1:]:
+    for line in part_lines:
         parts.append(Part(*all_ints(line)))
+    return workflows, parts
 
+def star1(data):
+    workflows, parts = data
     endpoint = {
         'A': [],
         'R': [],
@@ -131,26 +136,35 @@ def main(data):
     total_value = 0
     for part in endpoint['A']:
         total_value += part.value()
-    print(total_value)
+    return total_value
 
+def star2(data):
+    workflows, _ = data
     starting_ranges = {
         'x': range(1, 4001),
         'm': range(1, 4001),
         'a': range(1, 4001),
         's': range(1, 4001),
     }
-    print(count_accepted(workflows, 'in', starting_ranges))
+    return count_accepted(workflows, 'in', starting_ranges)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,19 +1,28 @@
 from argparse import ArgumentParser
+from copy import deepcopy
 from dataclasses import dataclass
 from math import lcm
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import METRICS, cached_parse, find_cycle, profile_solver, read_lines, solve_with_metrics
 
-@dataclass
+# Pulse values and flip-flop states
+LOW, HIGH = 0, 1
+OFF, ON = 0, 1
+
+@dataclass(slots=True)
 class Pulse:
     source: str
     dest: str
-    value: str
+    value: int
 
 class FlipFlop:
     def __init__(self, name: str) -> None:
         self.name = name
         self.sources = []
         self.dests = []
-        self.state = 'off'
+        self.state = OFF
 
     def add_source(self, source: str):
         self.sources.append(source)
@@ -25,14 +34,17 @@ class FlipFlop:
         return [Pulse(self.name, dest, value) for dest in self.dests]
 
     def receive(self, pulse: Pulse):
-        if pulse.value == 'high':
+        if pulse.value == HIGH:
             return []
-        if self.state == 'off':
-            self.state = 'on'
-            return self.send('high')
+        if self.state == OFF:
+            self.state = ON
+            return self.send(HIGH)
         else:
-            self.state = 'off'
-            return self.send('low')
+            self.state = OFF
+            return self.send(LOW)
+
+    def key(self):
+        return self.state
         
 class Conjunction:
     def __init__(self, name: str) -> None:
@@ -43,7 +55,7 @@ class Conjunction:
 
     def add_source(self, source: str):
         self.sources.append(source)
-        self.memory[source] = 'low'
+        self.memory[source] = LOW
 
     def add_dest(self, dest: str):
         self.dests.append(dest)
@@ -54,9 +66,12 @@ class Conjunction:
     def receive(self, pulse: Pulse):
         self.memory[pulse.source] = pulse.value
         for remembered_value in self.memory.values():
-            if remembered_value == 'low':
-                return self.send('high')
-        return self.send('low')
+            if remembered_value == LOW:
+                return self.send(HIGH)
+        return self.send(LOW)
+
+    def key(self):
+        return tuple(self.memory.values())
     
 class Broadcast:
     def __init__(self, name: str) -> None:
@@ -74,6 +89,9 @@ class Broadcast:
 
     def receive(self, pulse: Pulse):
         return self.send(pulse.value)
+
+    def key(self):
+        return None
     
 def initialize_modules(data):
     modules = {}
@@ -101,29 +119,45 @@ def initialize_modules(data):
 
     return modules
 
-def main(data):
-    modules = initialize_modules(data)
+@cached_parse(version=2)
+def read_input(input_file):
+    return initialize_modules(read_lines(input_file))
+
+def press_button(modules):
+    'Press the button once and return every pulse sent before the modules settle, in order.'
+    sent = []
+    current_pulses = [Pulse('button', 'broadcaster', LOW)]
+    while current_pulses:
+        sent.extend(current_pulses)
+        next_pulses = []
+        for pulse in current_pulses:
+            #print(f'{pulse.source} -{pulse.value}-> {pulse.dest}')
+            pulse_response = modules[pulse.dest].receive(pulse) if pulse.dest in modules else []
+            next_pulses.extend(pulse_response)
+        current_pulses = next_pulses
+    return sent
+
+def modules_key(modules):
+    return tuple(module.key() for module in modules.values())
+
+def star1(data):
+    # Modules hold state, so each star presses buttons on its own copy
+    modules = deepcopy(data)
+
+    # The state carries the (low, high) pulse counts of the press that produced it
+    def press(state):
+        pulses = press_button(state[0])
+        high = sum(pulse.value == HIGH for pulse in pulses)
+        return state[0], (len(pulses) - high, high)
 
     button_presses = 1000
-    total_pulses = {
-        'low': 0,
-        'high': 0,
-    }
-    for press in range(button_presses):
-        #print(f'Press {press}')
-        current_pulses = [Pulse('button', 'broadcaster', 'low')]
-        while current_pulses:
-            next_pulses = []
-            for pulse in current_pulses:
-                total_pulses[pulse.value] += 1
-                #print(f'{pulse.source} -{pulse.value}-> {pulse.dest}')
-                pulse_response = modules[pulse.dest].receive(pulse) if pulse.dest in modules else []
-                next_pulses.extend(pulse_response)
-            current_pulses = next_pulses
-    
-    print(total_pulses['low'] * total_pulses['high'])
+    cycle = find_cycle((modules, (0, 0)), press, lambda state: modules_key(state[0]), lambda state: state[1], limit=button_presses)
+    low, high = cycle.total(button_presses)
+    METRICS.add('pulses_sent', sum(map(sum, cycle.metrics)))
+    return low * high
 
-    modules = initialize_modules(data)
+def star2(data):
+    modules = deepcopy(data)
 
     # By inspection, &lx is the only source of rx
     # it has sources &cl, &rp, &lb, &nj
@@ -136,31 +170,36 @@ def main(data):
         'lb': 0,
         'nj': 0,
     }
+    pulses_sent = 0
     for press in range(1,10**9):
-        current_pulses = [Pulse('button', 'broadcaster', 'low')]
-        while current_pulses:
-            next_pulses = []
-            for pulse in current_pulses:
-                if pulse.source in lx_source_pulses and pulse.value == 'high' and not lx_source_pulses[pulse.source]:
-                    lx_source_pulses[pulse.source] = press
-                pulse_response = modules[pulse.dest].receive(pulse) if pulse.dest in modules else []
-                next_pulses.extend(pulse_response)
-            current_pulses = next_pulses
+        pulses = press_button(modules)
+        pulses_sent += len(pulses)
+        for pulse in pulses:
+            if pulse.source in lx_source_pulses and pulse.value == HIGH and not lx_source_pulses[pulse.source]:
+                lx_source_pulses[pulse.source] = press
         if all(lx_source_pulses.values()):
             break
+    METRICS.add('pulses_sent', pulses_sent)
 
-    print(lcm(*lx_source_pulses.values()))
+    return lcm(*lx_source_pulses.values())
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
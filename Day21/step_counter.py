@@ -1,37 +1,23 @@
 from argparse import ArgumentParser
 import numpy as np
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_grid as read_input
+from utils import DOT, HASH, START
+from utils import GridGraph, profile_solver, solve_with_metrics
+from search import bfs
 np.set_printoptions(linewidth=300, threshold=10000)
 
 class Maze:
     def __init__(self, data) -> None:
         self.data = data
         self.height, self.width = self.data.shape
-
-    def is_valid(self, loc):
-        return (0 <= loc[0] < self.height) and (0 <= loc[1] < self.width)
-    
-    def neighbors(self, loc):
-        neighbors = []
-        for offset in [(0,1), (0,-1), (-1,0), (1,0)]:
-            neighbor = (loc[0]+offset[0], loc[1]+offset[1])
-            if self.is_valid(neighbor) and self.data[neighbor] != '#':
-                neighbors.append(neighbor)
-        return neighbors
+        self.graph = GridGraph(self.data.shape, passable=self.data != HASH)
 
 def calculate_distance(grid: Maze, start, steps=64):
-    distances = -1 * np.ones(grid.data.shape, dtype=int)
-    distances[start] = 0
-
-    queue = [start]
-    while queue:
-        curr = queue.pop(0)
-        neighbors = grid.neighbors(curr)
-        for neighbor in neighbors:
-            if distances[neighbor] == -1:
-                distances[neighbor] = distances[curr] + 1
-                queue.append(neighbor)
-    
-    return distances
+    distances = bfs(grid.height * grid.width, [grid.graph.cell(start)], grid.graph.adjacency().__getitem__)
+    return np.array(distances).reshape(grid.data.shape)
 
 def grid_index(grid, loc, base_size):
         return grid[base_size*loc[0]:base_size*(loc[0]+1), base_size*loc[1]:base_size*(loc[1]+1)]
@@ -74,15 +60,15 @@ def count_axis(axis_grid, step_goal, parity_counts, diagonal_check=False):
     #     count += added_grids * (parity_counts[0] + parity_counts[1]) // 2
     return count, added_grids+1
 
-def main(data):
-    array = [[char for char in line] for line in data]
-    data = np.array(array)
+def find_start(data):
+    start = np.where(data == START)
+    return (start[0][0], start[1][0])
 
-    start = np.where(data == 'S')
-    start = (start[0][0], start[1][0])
-    data[start] = '.'
+def star1(data):
+    data = data.copy()
+    start = find_start(data)
+    data[start] = DOT
 
-    # Star 1
     maze = Maze(data)
     distances = calculate_distance(maze, start)
 
@@ -91,10 +77,9 @@ def main(data):
         for col in range(maze.width):
             if distances[row,col] < 65 and not distances[row,col] % 2:
                 exactly_64 += 1
-    print(exactly_64)
-
-    # Star 2
+    return exactly_64
 
+def star2(data):
     # Turns out you can just run it through an equation fitter.
     # These were generated by testing step counts 262 apart; 131 is the input size
     # and the factor of 2 is because of the parity flipping. 131 apart produced an answer
@@ -102,7 +87,7 @@ def main(data):
     # Note that the denominator of these fractions is 131**2
     step_goal = 26501365
     quadratic_consts = [15615/17161, 27143/17161, -106169/17161]
-    print(quadratic_consts[0]*step_goal**2 + quadratic_consts[1]*step_goal + quadratic_consts[2])
+    return quadratic_consts[0]*step_goal**2 + quadratic_consts[1]*step_goal + quadratic_consts[2]
 
     # step_goals = [65]
     # for _ in range(5):
@@ -169,17 +154,23 @@ def main(data):
     #     total_valid += parity_counts[1-parity] * filled_in//2
     # print(total_valid)
 
+def solve(data):
+    return star1(data), star2(data)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,86 +1,59 @@
 from argparse import ArgumentParser
-import re
 from dataclasses import dataclass
-from heapq import *
 import itertools
 import numpy as np
-from collections import defaultdict
+from collections import defaultdict, deque
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import cached_parse, profile_solver, read_ints, solve_with_metrics
 
-def all_ints(s):
-    return [int(i) for i in re.findall(r'\b\d+\b', s)]
-
-REMOVED = '<removed-node>'      # placeholder for a removed node
-heap_counter = itertools.count()     # unique sequence count
-
-def add_node(pq, entry_finder, counter, node, distance=0):
-    'Add a new node or update an existing node'
-    if node in entry_finder:
-        remove_node(entry_finder,node)
-    count = next(counter)
-    entry = [distance, count, node]
-    entry_finder[node] = entry
-    heappush(pq, entry)
-
-def remove_node(entry_finder, node):
-    'Mark an existing node as REMOVED.  Raise KeyError if not found.'
-    entry = entry_finder.pop(node)
-    entry[-1] = REMOVED
-
-def pop_node(pq, entry_finder):
-    'Remove and return the lowest distance node. Raise KeyError if empty.'
-    while pq:
-        distance, count, node = heappop(pq)
-        if node is not REMOVED:
-            del entry_finder[node]
-            return distance,node
-    raise KeyError('pop from an empty priority queue')
-
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Block:
+    'A brick from (x1, y1, z1) to (x2, y2, z2), inclusive.'
     idy: int
-    xrange: range
-    yrange: range
-    zrange: range
+    x1: int
+    y1: int
+    z1: int
+    x2: int
+    y2: int
+    z2: int
 
 def drop_block(grid, block):
     blocking_ids = set()
-    for z in range(block.zrange.start, -1, -1):
+    for z in range(block.z1, -1, -1):
         blocked = False
         blocking_ids = set()
-        for x in block.xrange:
-            for y in block.yrange:
+        for x in range(block.x1, block.x2+1):
+            for y in range(block.y1, block.y2+1):
                 if grid[x,y,z] != -1:
                     blocked = True
                     blocking_ids.add(grid[x,y,z])
         if blocked:
-            new_block = Block(block.idy, block.xrange, block.yrange, range(z+1, z+1+len(block.zrange)))
+            new_block = Block(block.idy, block.x1, block.y1, z+1, block.x2, block.y2, z+1 + block.z2-block.z1)
             supported_by = blocking_ids
             break
 
-    for x in new_block.xrange:
-        for y in new_block.yrange:
-            for z in new_block.zrange:
+    for x in range(new_block.x1, new_block.x2+1):
+        for y in range(new_block.y1, new_block.y2+1):
+            for z in range(new_block.z1, new_block.z2+1):
                 grid[x,y,z] = new_block.idy
 
     return new_block, supported_by
 
-def main(data):
+def settle(bricks):
     blocks = []
     id_gen = itertools.count(1)
-    entry_finder = {}
-    for line in data:
-        x1, y1, z1, x2, y2, z2 = all_ints(line)
-        block = Block(next(id_gen), range(x1,x2+1), range(y1,y2+1), range(z1,z2+1))
-        # Need a priority queue (or other iterable sorted by z) so that lower blocks fall first
-        add_node(blocks, entry_finder, heap_counter, block, z1)
+    for brick in bricks:
+        blocks.append(Block(next(id_gen), *brick))
 
     # Note: input data keeps 0 <= x,y < 10, 1 <= z < 300
     grid = -1 * np.ones((10,10,300))
     grid[:,:,0] = 0
     supported_by = {}
     new_blocks = {}
-    while blocks:
-        _, block = pop_node(blocks, entry_finder)
+    # Lower blocks have to fall first, and no block's z changes before it falls, so a sort is enough
+    for block in sorted(blocks, key=lambda block: block.z1):
         new_block, relies_on = drop_block(grid, block)
         new_blocks[new_block.idy] = new_block
         supported_by[new_block.idy] = relies_on
@@ -92,6 +65,9 @@ def main(data):
         for bottom in bottoms:
             supports[bottom].add(top)
 
+    return supported_by, supports, len(bricks)
+
+def find_removable(supported_by, supports):
     removable = set()
     # A brick is removable if all of the blocks that it supports are also supported by other bricks
     for bottom, tops in supports.items():
@@ -102,15 +78,26 @@ def main(data):
                 break
         if not required:
             removable.add(bottom)
-    print(len(removable))
+    return removable
 
-    required = set(range(next(id_gen))) - removable - {0}
+@cached_parse(version=1)
+def read_input(input_file):
+    values, _ = read_ints(input_file)
+    return settle(values.reshape(-1, 6).tolist())
+
+def star1(data):
+    supported_by, supports, _ = data
+    return len(find_removable(supported_by, supports))
+
+def star2(data):
+    supported_by, supports, block_count = data
+    required = set(range(1, block_count+1)) - find_removable(supported_by, supports)
     total_fallen = 0
     for block_id in required:
         fallen = {block_id}
-        fall_queue = list(supports[block_id])
+        fall_queue = deque(supports[block_id])
         while fall_queue:
-            poss = fall_queue.pop(0)
+            poss = fall_queue.popleft()
             no_support = True
             for supporter in supported_by[poss]:
                 if supporter not in fallen:
@@ -120,18 +107,25 @@ def main(data):
                 fallen.add(poss)
                 fall_queue.extend(supports[poss])
         total_fallen += len(fallen) - 1
-    print(total_fallen)
+    return total_fallen
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
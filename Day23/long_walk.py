@@ -1,62 +1,53 @@
 from argparse import ArgumentParser
-import numpy as np
-import networkx as nx
+from collections import deque
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import Engines, GridGraph, METRICS, cached_parse, profile_solver, read_grid, solve_with_metrics
+from utils import DOT, HASH, SLOPE_N, SLOPE_E, SLOPE_S, SLOPE_W, NORTH, EAST, SOUTH, WEST
+
+SLOPE_DIRS = {
+    SLOPE_N: NORTH,
+    SLOPE_E: EAST,
+    SLOPE_S: SOUTH,
+    SLOPE_W: WEST,
+}
 
 class Maze:
     def __init__(self, data) -> None:
         self.data = data
         self.height, self.width = self.data.shape
 
-    def is_valid(self, loc):
-        return (
-            (0 <= loc[0] < self.height) and 
-            (0 <= loc[1] < self.width) and
-            self.data[loc] != '#'
-        )
-    
-    def neighbors(self, loc, seen):
-        neighbors = []
-        match self.data[loc]:
-            case '.':
-                offsets = [(0,1), (0,-1), (-1,0), (1,0)]
-            case '<':
-                offsets = [(0,-1)]
-            case '>':
-                offsets = [(0,1)]
-            case '^':
-                offsets = [(-1,0)]
-            case 'v':
-                offsets = [(1,0)]
-            case _:
-                offsets = []
-        for offset in offsets:
-            neighbor = (loc[0]+offset[0], loc[1]+offset[1])
-            if self.is_valid(neighbor) and neighbor not in seen:
-                neighbors.append(neighbor)
-        return neighbors
-    
+    def slope_moves(self, direction):
+        'GridGraph rule: paths lead every way but slopes only lead downhill.'
+        slope = next(slope for slope, slope_dir in SLOPE_DIRS.items() if slope_dir == direction)
+        return (self.data == DOT) | (self.data == slope)
+
+    def graph(self):
+        return GridGraph(self.data.shape, passable=self.data != HASH, moves=self.slope_moves)
+
 def build_graph(maze, start, goal, part1=True):
+    import networkx as nx
+
     if part1:
         G = nx.DiGraph()
     else:
         G = nx.Graph()
 
+    grid = maze.graph()
+    adjacency = grid.adjacency()
     for node in (start, goal):
         G.add_node(node)
-    for row in range(maze.height):
-        for col in range(maze.width):
-            if len(maze.neighbors((row,col), set())) in (3,4):
-                G.add_node((row,col))
+    G.add_nodes_from(cell for cell, degree in enumerate(grid.degrees().ravel().tolist()) if degree in (3,4))
 
+    # Walk each corridor out of a junction until it reaches the next one
     for node in G.nodes:
-        queue = []
-        neighbors = maze.neighbors(node, set())
-        for neighbor in neighbors:
-            queue.append((neighbor, 1, {node}))
+        queue = deque((neighbor, 1, {node}) for neighbor in adjacency[node])
         while queue:
-            curr_loc, curr_dist, curr_seen = queue.pop(0)
-            neighbors = maze.neighbors(curr_loc, curr_seen)
-            for neighbor in neighbors:
+            curr_loc, curr_dist, curr_seen = queue.popleft()
+            for neighbor in adjacency[curr_loc]:
+                if neighbor in curr_seen:
+                    continue
                 if neighbor in G.nodes:
                     G.add_edge(node, neighbor, weight=curr_dist+1)
                 else:
@@ -66,31 +57,83 @@ def build_graph(maze, start, goal, part1=True):
 
     return G
 
-def main(data):
-    array = [[char for char in line] for line in data]
-    data = np.array(array)
+@cached_parse(version=2)
+def read_input(input_file):
+    maze = Maze(read_grid(input_file).copy())
+    # Nodes are GridGraph cell ids
+    start = 1
+    goal = maze.height*maze.width - 2
 
-    maze = Maze(data)
-    start = (0, 1)
-    goal = (maze.height-1, maze.width-2)
+    slippery = build_graph(maze, start, goal)
+    maze.data[maze.data != HASH] = DOT
+    dry = build_graph(maze, start, goal, part1=False)
+    return slippery, dry, start, goal
 
-    G = build_graph(maze, start, goal)
-    print(max((nx.path_weight(G, path, 'weight') for path in nx.all_simple_paths(G, start, goal))))
+ENGINES = Engines(default='bitmask-dfs')
 
-    maze.data[maze.data != '#'] = '.'
-    G = build_graph(maze, start, goal, part1=False)
-    print(max((nx.path_weight(G, path, 'weight') for path in nx.all_simple_paths(G, start, goal))))
+@ENGINES.register('networkx')
+def longest_path(G, start, goal):
+    import networkx as nx
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+    longest = paths = 0
+    for path in nx.all_simple_paths(G, start, goal):
+        paths += 1
+        longest = max(longest, nx.path_weight(G, path, 'weight'))
+    METRICS.add('paths_enumerated', paths)
+    return longest
+
+@ENGINES.register('bitmask-dfs')
+def bitmask_longest_path(G, start, goal):
+    # Junctions are renumbered 0..n-1 so the junctions on a path fit in the bits of one int
+    index = {node: idx for idx, node in enumerate(G.nodes)}
+    neighbors = [[(index[neighbor], edge['weight']) for neighbor, edge in G.adj[node].items()] for node in G.nodes]
+    start, goal = index[start], index[goal]
+    # If only one junction leads to the goal, leaving it any other way cuts the goal off
+    entries = [node for node, edges in enumerate(neighbors) if any(neighbor == goal for neighbor, _ in edges)]
+    if len(entries) == 1:
+        neighbors[entries[0]] = [edge for edge in neighbors[entries[0]] if edge[0] == goal]
+
+    longest = paths = 0
+    stack = [(start, 1 << start, 0)]
+    while stack:
+        node, seen, dist = stack.pop()
+        if node == goal:
+            paths += 1
+            longest = max(longest, dist)
+            continue
+        for neighbor, weight in neighbors[node]:
+            if not seen >> neighbor & 1:
+                stack.append((neighbor, seen | 1 << neighbor, dist + weight))
+    METRICS.add('paths_enumerated', paths)
+    return longest
+
+def star1(data):
+    slippery, _, start, goal = data
+    return ENGINES(slippery, start, goal)
+
+def star2(data):
+    _, dry, start, goal = data
+    return ENGINES(dry, start, goal)
+
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
+    parser.add_argument('--engine', choices=ENGINES.names(), help=f'implementation to run (default: {ENGINES.default})')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    ENGINES.select(args.engine)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,13 +1,12 @@
 from argparse import ArgumentParser
-from dataclasses import dataclass
-from sympy import symbols, solve
+from dataclasses import astuple, dataclass
 import numpy as np
-import re
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import parallel_map, profile_solver, read_ints, solve_with_metrics
 
-def all_ints(s):
-    return [int(i) for i in re.findall(r'-?\d+', s)]
-
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Hailstone:
     px: int
     py: int
@@ -22,7 +21,7 @@ class Hailstone:
     def time(self, x):
         return (x - self.px) / self.vx
     
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Point:
     x: float
     y: float
@@ -58,17 +57,19 @@ def find_intersection(hail1: Hailstone, hail2: Hailstone):
 
     return (Point(x,y,z1,t1), Point(x,y,z2,t2))
 
-def main(data):
-    hailstones = []
-    for line in data:
-        hailstones.append(Hailstone(*all_ints(line)))
+def read_input(input_file):
+    values, _ = read_ints(input_file)
+    return [Hailstone(*row) for row in values.reshape(-1, 6).tolist()]
 
-    # Star 1
+def count_intersections(first_indexes, arrays):
+    'Crossings inside the test area of each hailstone in first_indexes with every later hailstone.'
     #test_min, test_max = 7, 27
     test_min, test_max = 200000000000000, 400000000000000
-    
+
+    hailstones = [Hailstone(*row) for row in arrays['hailstones'].tolist()]
     intersections = 0
-    for idx, hailstone1 in enumerate(hailstones):
+    for idx in first_indexes:
+        hailstone1 = hailstones[idx]
         for hailstone2 in hailstones[idx+1:]:
             locs = find_intersection(hailstone1, hailstone2)
             #print(locs)
@@ -80,9 +81,16 @@ def main(data):
                     valid = False
             if valid:
                 intersections += 1
-    print(intersections)
+    return intersections
+
+def star1(hailstones):
+    # Workers read the hailstones from shared memory and each check the pairs of a slice of first stones
+    rows = np.array([astuple(hailstone) for hailstone in hailstones], dtype=np.int64)
+    return parallel_map(count_intersections, range(len(hailstones)), {'hailstones': rows}, reduce=sum)
+
+def star2(hailstones):
+    from sympy import symbols, solve
 
-    # Star 2
     # variables: px, py, pz, vx, vy, vz, t1, t2, ..., tn
     # px + vx*t1 = px1 + vx1*t1
     # each of these for 3 points gives 9 equations, 9 unknowns
@@ -99,18 +107,25 @@ def main(data):
         pz + vz*t3 - hailstones[2].pz - hailstones[2].vz*t3,
     ], [px,py,pz,vx,vy,vz,t1,t2,t3], dict=True)
     soln = soln[0]
-    print(sum((soln[px], soln[py], soln[pz])))
+    return sum((soln[px], soln[py], soln[pz]))
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    return star1(data), star2(data)
+
+def main(data):
+    for answer in solve(data):
+        print(answer)
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
@@ -1,8 +1,13 @@
 from argparse import ArgumentParser
-import networkx as nx
-import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import read_lines as read_input
+from utils import profile_solver, solve_with_metrics
+
+def star1(data):
+    import networkx as nx
 
-def main(data):
     G = nx.Graph()
     for line in data:
         source, dests = line.split(': ')
@@ -14,18 +19,25 @@ def main(data):
     # removed to split the graph in two. We know there will be three of them in this case.
     G.remove_edges_from(nx.minimum_edge_cut(G))
     g1, g2 = nx.connected_components(G)
-    print(len(g1) * len(g2))
+    return len(g1) * len(g2)
 
-def read_input(input_file):
-    data = []
-    with open(input_file, 'r') as input:
-        for line in input:
-            data.append(line.strip())
-    return data
+def solve(data):
+    # The last day has only the one puzzle
+    return star1(data), None
+
+def main(data):
+    print(solve(data)[0])
 
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('input_file', nargs='?', default='input.txt')
+    parser.add_argument('--profile', action='store_true', help='time, cProfile and trace memory of each phase instead of printing answers')
+    parser.add_argument('--metrics', action='store_true', help='print answers with hot loop counters as json')
     args = parser.parse_args()
-    data = read_input(args.input_file)
-    main(data)
+    if args.profile:
+        profile_solver(sys.modules[__name__], args.input_file)
+    elif args.metrics:
+        solve_with_metrics(sys.modules[__name__], read_input(args.input_file))
+    else:
+        data = read_input(args.input_file)
+        main(data)
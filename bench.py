@@ -0,0 +1,147 @@
+from argparse import ArgumentParser
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from utils import day_module, engine_names, parse_days
+
+PHASES = ('parse', 'star1', 'star2')
+
+def percentile(values, fraction):
+    'Nearest-rank percentile of a list of numbers.'
+    values = sorted(values)
+    return values[max(0, math.ceil(fraction*len(values)) - 1)]
+
+def clear_caches(module):
+    'Empty functools caches on module level functions so every run starts cold.'
+    for value in vars(module).values():
+        if callable(getattr(value, 'cache_clear', None)):
+            value.cache_clear()
+
+def run_phases(module, input_file, trace_memory=False):
+    'One parse + star1 + star2 run. Returns seconds per phase, and peak bytes allocated per phase when tracing.'
+    timings, peaks = {}, {}
+    data = None
+    clear_caches(module)
+    for phase in PHASES:
+        if phase != 'parse' and not hasattr(module, phase):
+            continue
+        if trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        if phase == 'parse':
+            data = module.read_input(input_file)
+        else:
+            getattr(module, phase)(data)
+        timings[phase] = time.perf_counter() - start
+        if trace_memory:
+            peaks[phase] = tracemalloc.get_traced_memory()[1] - before
+    return timings, peaks
+
+def bench_day(day, input_file, repeat=5, trace_memory=True, engine=None):
+    module = day_module(day)
+    if engine_names(module):
+        module.ENGINES.select(engine if engine in engine_names(module) else None)
+    runs = [run_phases(module, input_file)[0] for _ in range(repeat)]
+    results = {}
+    for phase in runs[0]:
+        samples = [run[phase] for run in runs]
+        results[phase] = {
+            'min': min(samples),
+            'median': statistics.median(samples),
+            'p95': percentile(samples, 0.95),
+        }
+    # Memory is measured in a separate run since tracemalloc slows everything down
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            _, peaks = run_phases(module, input_file, trace_memory=True)
+        finally:
+            tracemalloc.stop()
+        for phase, peak in peaks.items():
+            results[phase]['peak_bytes'] = peak
+    return results
+
+def engine_answers(day, input_file):
+    'Answers from every engine a day offers, as {engine: (star1, star2)}.'
+    module = day_module(day)
+    answers = {}
+    for engine in engine_names(module):
+        module.ENGINES.select(engine)
+        answers[engine] = module.solve(module.read_input(input_file))
+    module.ENGINES.select()
+    return answers
+
+def find_regressions(results, baseline, tolerance=0.25, noise_floor=0.001):
+    'Phases whose median got slower than the baseline by more than tolerance (and more than noise_floor seconds).'
+    regressions = []
+    for day, phases in results.items():
+        for phase, stats in phases.items():
+            old = baseline.get(day, {}).get(phase)
+            if old is None:
+                continue
+            new_time, old_time = stats['median'], old['median']
+            if new_time > old_time * (1 + tolerance) and new_time - old_time > noise_floor:
+                regressions.append((day, phase, new_time, old_time))
+    return regressions
+
+def main(args):
+    # Star timings should measure the solvers, even when --parse-cache keeps parsed inputs
+    os.environ['AOC_MEMO'] = '0'
+    if not args.parse_cache:
+        # Parse timings should measure parsing, not unpickling an earlier run's result
+        os.environ['AOC_PARSE_CACHE'] = '0'
+    results = {}
+    mismatched = False
+    for day in parse_days(args.days):
+        input_file = Path(args.input.format(day=day))
+        if not input_file.exists():
+            print(f'Day {day:02d}: skipped, {input_file} not found')
+            continue
+        # Comparing runs every engine, keyed day:engine so they sit side by side in the json
+        engines = engine_names(day_module(day)) if args.compare_engines else []
+        for engine in engines or [args.engine]:
+            key = f'{day:02d}:{engine}' if engines else f'{day:02d}'
+            results[key] = bench_day(day, input_file, args.repeat, not args.no_memory, engine)
+            for phase, stats in results[key].items():
+                memory = f'  peak {stats["peak_bytes"]/2**20:8.2f} MiB' if 'peak_bytes' in stats else ''
+                print(f'Day {key} {phase:<6} min {stats["min"]:9.4f}s  median {stats["median"]:9.4f}s  p95 {stats["p95"]:9.4f}s{memory}')
+        if len(engines) > 1:
+            answers = engine_answers(day, input_file)
+            if len(set(answers.values())) > 1:
+                mismatched = True
+                for engine, engine_answer in answers.items():
+                    print(f'MISMATCH Day {day:02d} {engine}: {engine_answer}')
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as input:
+            baseline = json.load(input)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for day, phase, new_time, old_time in regressions:
+            print(f'REGRESSION Day {day} {phase}: median {new_time:.4f}s vs {old_time:.4f}s baseline')
+        if regressions:
+            return 1
+    return 1 if mismatched else 0
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Time parsing and each star of the daily solvers')
+    parser.add_argument('days', nargs='*', help='days to run, e.g. 5, 1-25 or 3,7 (default: all)')
+    parser.add_argument('--input', default='Day{day:02d}/input.txt', help='input path pattern, formatted with the day number')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--parse-cache', action='store_true', help='let read_input use the on-disk parse cache')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    parser.add_argument('--engine', help='engine for days that offer it, see --engine on each day (default: their own default)')
+    parser.add_argument('--compare-engines', action='store_true', help='time every engine of days that have several and check they agree')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--baseline', help='compare medians against results from an earlier --json run')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown as a fraction of the baseline median')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,151 @@
+from argparse import ArgumentParser
+import json
+import os
+import pickle
+import socket
+import socketserver
+import sys
+import threading
+import time
+from utils import ROOT, day_module, engine_names, json_value, parse_days
+
+STARS = ('star1', 'star2')
+
+def socket_path():
+    'Where the daemon listens. Set AOC_DAEMON_SOCKET to use another path.'
+    return os.environ.get('AOC_DAEMON_SOCKET', str(ROOT / '.cache' / 'daemon.sock'))
+
+class ParsedInputs:
+    '''
+    Parsed inputs kept in memory as pickles, keyed by path, size and modification time so edited
+    inputs are parsed again. Every request unpickles its own copy, so stars that edit their data
+    cannot leak changes into the next request. Inputs that cannot be pickled are parsed every time.
+    '''
+    def __init__(self) -> None:
+        self.pickles = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def load(self, day, input_file):
+        stat = os.stat(input_file)
+        key = (day, os.path.abspath(input_file), stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            key_lock = self.locks.setdefault(key, threading.Lock())
+        # Requests for the same input wait for one parse instead of each parsing it
+        with key_lock:
+            if key in self.pickles:
+                return pickle.loads(self.pickles[key])
+            data = day_module(day).read_input(input_file)
+            try:
+                self.pickles[key] = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                pass
+            return data
+
+# ENGINES is a module global, so days with engines solve one request at a time
+_ENGINE_LOCKS = {}
+_ENGINE_LOCKS_LOCK = threading.Lock()
+
+def solve_answers(day, input_file, parsed=None, engine=None):
+    '''
+    Answers of every star of a day as {star: answer}, parsing through parsed when given and using
+    the named engine, or the day's default. Raise ValueError for an engine the day does not offer.
+    '''
+    module = day_module(day)
+    if engine and engine not in engine_names(module):
+        raise ValueError(f'{module.__name__} has no engine {engine!r}, it offers: {", ".join(engine_names(module)) or "none"}')
+    data = parsed.load(day, input_file) if parsed else module.read_input(input_file)
+    if not engine_names(module):
+        return {star: getattr(module, star)(data) for star in STARS if hasattr(module, star)}
+    with _ENGINE_LOCKS_LOCK:
+        lock = _ENGINE_LOCKS.setdefault(day, threading.Lock())
+    with lock:
+        module.ENGINES.select(engine)
+        try:
+            return {star: getattr(module, star)(data) for star in STARS if hasattr(module, star)}
+        finally:
+            module.ENGINES.select()
+
+class Handler(socketserver.StreamRequestHandler):
+    'One json request per line: {"day": 5, "input": "path", "engine": "name"}, answered by one json line.'
+    def handle(self):
+        for line in self.rfile:
+            start = time.perf_counter()
+            try:
+                request = json.loads(line)
+                if request.get('command') == 'stop':
+                    reply = {'status': 'ok'}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    answers = solve_answers(int(request['day']), request['input'], self.server.parsed, request.get('engine'))
+                    reply = {'status': 'ok', 'answers': answers}
+            except Exception as error:
+                reply = {'status': 'error', 'error': repr(error)}
+            reply['seconds'] = time.perf_counter() - start
+            self.wfile.write(json.dumps(reply, default=json_value).encode() + b'\n')
+            self.wfile.flush()
+
+class SolverServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, preload=()) -> None:
+        self.parsed = ParsedInputs()
+        # Import up front so the first request for each day does not pay for NumPy and friends
+        for day in preload:
+            day_module(day)
+        if os.path.exists(path):
+            os.unlink(path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        super().__init__(path, Handler)
+
+def serve(path=None, preload=()):
+    '''
+    Answer solve requests on a Unix socket until stopped, each connection on its own thread. Stars
+    are CPU bound and share the GIL, so this saves start up, imports and parsing rather than adding
+    parallelism; run.py --all is still the way to spread one batch over every core.
+    '''
+    path = path or socket_path()
+    with SolverServer(path, preload) as server:
+        print(f'Listening on {path}', flush=True)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+def request(message, path=None, timeout=None):
+    'Send one json message to a running daemon and return its reply. Raises OSError if none is listening.'
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(path or socket_path())
+        connection.sendall(json.dumps(message).encode() + b'\n')
+        reply = connection.makefile('rb').readline()
+    if not reply:
+        raise ConnectionError('daemon closed the connection without replying')
+    return json.loads(reply)
+
+def solve(day, input_file, path=None, engine=None):
+    'Answers of every star of a day from the daemon, or solved in this process if no daemon is running.'
+    message = {'day': day, 'input': os.path.abspath(input_file)}
+    if engine:
+        message['engine'] = engine
+    try:
+        reply = request(message, path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return solve_answers(day, input_file, engine=engine)
+    if reply['status'] != 'ok':
+        raise RuntimeError(f'daemon failed on day {day}: {reply["error"]}')
+    return reply['answers']
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Keep solver modules and parsed inputs warm behind a Unix socket')
+    parser.add_argument('command', choices=('serve', 'stop'))
+    parser.add_argument('--socket', help='socket path (default: $AOC_DAEMON_SOCKET or .cache/daemon.sock)')
+    parser.add_argument('--preload', nargs='*', help='days to import before listening, e.g. 1-25 (no days: all)')
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args.socket, parse_days(args.preload) if args.preload is not None else ())
+    else:
+        try:
+            request({'command': 'stop'}, args.socket)
+        except (FileNotFoundError, ConnectionRefusedError):
+            sys.exit('no daemon is running')
@@ -0,0 +1,536 @@
+from argparse import ArgumentParser
+from math import log2
+from pathlib import Path
+import random
+import string
+import subprocess
+import sys
+import tempfile
+from utils import ROOT, day_module_name, parse_days
+
+# Each generator takes a seeded random.Random and a scale factor relative to the real puzzle
+# size and returns the text of a valid input file. Grid days scale their area, so a 100x
+# scale is a 10x wider and taller grid.
+
+def side(base, scale, minimum=5):
+    return max(minimum, round(base * scale**0.5))
+
+def count(base, scale, minimum=1):
+    return max(minimum, round(base * scale))
+
+def gen_day01(rng, scale):
+    words = ['zero','one','two','three','four','five','six','seven','eight','nine']
+    lines = []
+    for _ in range(count(1000, scale)):
+        pieces = [str(rng.randint(1, 9))]
+        for _ in range(rng.randint(1, 6)):
+            match rng.randrange(3):
+                case 0: pieces.append(str(rng.randint(1, 9)))
+                case 1: pieces.append(rng.choice(words[1:]))
+                case 2: pieces.append(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 5))))
+        rng.shuffle(pieces)
+        lines.append(''.join(pieces))
+    return '\n'.join(lines) + '\n'
+
+def gen_day02(rng, scale):
+    lines = []
+    for gid in range(1, count(100, scale)+1):
+        hands = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(['red', 'green', 'blue'], rng.randint(1, 3))
+            hands.append(', '.join(f'{rng.randint(1, 20)} {color}' for color in colors))
+        lines.append(f'Game {gid}: ' + '; '.join(hands))
+    return '\n'.join(lines) + '\n'
+
+def gen_day03(rng, scale):
+    size = side(140, scale)
+    grid = [['.'] * size for _ in range(size)]
+    for row in range(size):
+        col = rng.randint(0, 3)
+        while col < size:
+            if rng.random() < 0.3:
+                number = str(rng.randint(1, 999))[:size-col]
+                grid[row][col:col+len(number)] = number
+                col += len(number)
+            elif rng.random() < 0.1:
+                grid[row][col] = rng.choice('*#+$/=%@&-')
+            col += rng.randint(1, 4)
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+def gen_day04(rng, scale):
+    lines = []
+    for card in range(1, count(200, scale)+1):
+        numbers = rng.sample(range(1, 100), 35)
+        winning, present = numbers[:10], numbers[10:]
+        # Overlap some of the present numbers with the winning ones
+        for idx in rng.sample(range(25), rng.randint(0, 10)):
+            present[idx] = winning[idx % 10]
+        present = list(dict.fromkeys(present))
+        lines.append(f'Card {card:3}: ' + ' '.join(f'{n:2}' for n in winning) + ' | ' + ' '.join(f'{n:2}' for n in present))
+    return '\n'.join(lines) + '\n'
+
+def gen_day05(rng, scale):
+    # Every map permutes chunks of [0, domain), so each map is a bijection. With seed ranges covering
+    # more than half the domain, some seed is guaranteed to land below the reverse search bound.
+    domain = count(10**6, scale, 1000)
+    pairs = []
+    cuts = sorted(rng.sample(range(1, domain), 19))
+    bounds = list(zip([0] + cuts, cuts + [domain]))
+    for start, stop in rng.sample(bounds, 12):
+        pairs.extend([start, stop - start])
+    names = ['seed', 'soil', 'fertilizer', 'water', 'light', 'temperature', 'humidity', 'location']
+    sections = ['seeds: ' + ' '.join(str(n) for n in pairs)]
+    for source, dest in zip(names, names[1:]):
+        cuts = sorted(rng.sample(range(1, domain), rng.randint(5, 40)))
+        chunks = list(zip([0] + cuts, cuts + [domain]))
+        dests = chunks[:]
+        rng.shuffle(dests)
+        lines = [f'{source}-to-{dest} map:']
+        dest_start = 0
+        for src_start, src_stop in dests:
+            lines.append(f'{dest_start} {src_start} {src_stop - src_start}')
+            dest_start += src_stop - src_start
+        sections.append('\n'.join(lines))
+    return '\n\n'.join(sections) + '\n'
+
+def gen_day06(rng, scale):
+    times, records = [], []
+    for _ in range(4):
+        total = rng.randint(7, count(100, scale, 10))
+        held = rng.randint(1, total // 2)
+        times.append(total)
+        records.append(held * (total - held))
+    return 'Time:      ' + '  '.join(f'{t:4}' for t in times) + '\nDistance:  ' + '  '.join(f'{d:4}' for d in records) + '\n'
+
+def gen_day07(rng, scale):
+    lines = []
+    for _ in range(count(1000, scale)):
+        hand = ''.join(rng.choices('AKQJT98765432', k=5))
+        lines.append(f'{hand} {rng.randint(1, 1000)}')
+    return '\n'.join(lines) + '\n'
+
+def gen_day08(rng, scale):
+    # Each ghost walks a ladder of node pairs where both turns lead one layer deeper, ending on a
+    # single Z node that loops back to the first layer, so every cycle length is the ladder length
+    letters = string.ascii_uppercase[1:25]
+    names = iter(rng.sample([a+b+c for a in letters for b in letters for c in letters], 24**3))
+    turns = ''.join(rng.choices('LR', k=count(263, scale, 2)))
+    starts = ['AAA'] + [next(names)[:2] + 'A' for _ in range(rng.randint(2, 5))]
+    # Names ending in A or Z are reserved for the starts and ends
+    names = (name for name in names if name[2] not in 'AZ')
+    lines = []
+    for start in starts:
+        end = 'ZZZ' if start == 'AAA' else start[:2] + 'Z'
+        layers = [[start]]
+        for _ in range(rng.randint(max(2, count(40, scale)), max(3, count(80, scale)))):
+            layers.append([next(names), next(names)])
+        layers.append([end])
+        for layer, children in zip(layers, layers[1:] + [layers[1]]):
+            for node in layer:
+                left, right = rng.choice(children), rng.choice(children)
+                lines.append(f'{node} = ({left}, {right})')
+    rng.shuffle(lines)
+    return turns + '\n\n' + '\n'.join(lines) + '\n'
+
+def gen_day09(rng, scale):
+    lines = []
+    for _ in range(count(200, scale)):
+        coeffs = [rng.randint(-9, 9) for _ in range(rng.randint(1, 6))]
+        values = [sum(c * x**power for power, c in enumerate(coeffs)) for x in range(21)]
+        lines.append(' '.join(str(v) for v in values))
+    return '\n'.join(lines) + '\n'
+
+def spanning_tree_loop(rng, rows, cols, fill=0.6):
+    '''
+    A random simple loop on a (2*rows, 2*cols) grid: grow a random spanning tree over part of a
+    coarse (rows, cols) grid and walk around it. Returns the set of links between fine cells.
+    '''
+    first = (rng.randrange(rows), rng.randrange(cols))
+    tree = {first}
+    edges = []
+    frontier = [first]
+    target = max(2, int(rows * cols * fill))
+    while frontier and len(tree) < target:
+        cell = frontier[rng.randrange(len(frontier))]
+        options = [(cell[0]+dr, cell[1]+dc) for dr, dc in ((0,1),(1,0),(0,-1),(-1,0))
+                   if 0 <= cell[0]+dr < rows and 0 <= cell[1]+dc < cols and (cell[0]+dr, cell[1]+dc) not in tree]
+        if not options:
+            frontier.remove(cell)
+            continue
+        child = rng.choice(options)
+        tree.add(child)
+        edges.append((cell, child))
+        frontier.append(child)
+
+    links = set()
+    def link(a, b):
+        links.add((min(a, b), max(a, b)))
+    def unlink(a, b):
+        links.discard((min(a, b), max(a, b)))
+    for row, col in tree:
+        top_left, top_right = (2*row, 2*col), (2*row, 2*col+1)
+        bottom_left, bottom_right = (2*row+1, 2*col), (2*row+1, 2*col+1)
+        link(top_left, top_right); link(bottom_left, bottom_right)
+        link(top_left, bottom_left); link(top_right, bottom_right)
+    for (r1, c1), (r2, c2) in edges:
+        (r1, c1), (r2, c2) = min((r1, c1), (r2, c2)), max((r1, c1), (r2, c2))
+        if r1 == r2:
+            unlink((2*r1, 2*c1+1), (2*r1+1, 2*c1+1)); unlink((2*r2, 2*c2), (2*r2+1, 2*c2))
+            link((2*r1, 2*c1+1), (2*r2, 2*c2)); link((2*r1+1, 2*c1+1), (2*r2+1, 2*c2))
+        else:
+            unlink((2*r1+1, 2*c1), (2*r1+1, 2*c1+1)); unlink((2*r2, 2*c2), (2*r2, 2*c2+1))
+            link((2*r1+1, 2*c1), (2*r2, 2*c2)); link((2*r1+1, 2*c1+1), (2*r2, 2*c2+1))
+    return links
+
+def loop_order(links):
+    'Cells of a loop in walking order.'
+    neighbors = {}
+    for a, b in links:
+        neighbors.setdefault(a, []).append(b)
+        neighbors.setdefault(b, []).append(a)
+    start = min(neighbors)
+    order = [start]
+    prev, curr = start, neighbors[start][0]
+    while curr != start:
+        order.append(curr)
+        prev, curr = curr, next(n for n in neighbors[curr] if n != prev)
+    return order
+
+def loop_corners(order):
+    'The cells where a loop turns, in walking order, starting and ending on the same corner.'
+    corners = [cell for idx, cell in enumerate(order)
+               if order[idx-1][0] != order[(idx+1) % len(order)][0] and order[idx-1][1] != order[(idx+1) % len(order)][1]]
+    return corners + [corners[0]]
+
+def gen_day10(rng, scale):
+    # Stretching the loop's rows and columns apart leaves room for tiles inside it
+    size = side(25, scale, 2)
+    corners = loop_corners(loop_order(spanning_tree_loop(rng, size, size)))
+    rows, cols = monotone_coords(rng, 2*size, 1, 4), monotone_coords(rng, 2*size, 1, 4)
+    corners = [(rows[row], cols[col]) for row, col in corners]
+    height, width = rows[-1] + 1, cols[-1] + 1
+    dirs = {}
+    for (r1, c1), (r2, c2) in zip(corners, corners[1:]):
+        step = ((r2 > r1) - (r2 < r1), (c2 > c1) - (c2 < c1))
+        out_dir, in_dir = {(-1,0): ('n','s'), (1,0): ('s','n'), (0,1): ('e','w'), (0,-1): ('w','e')}[step]
+        cell = (r1, c1)
+        while cell != (r2, c2):
+            dirs.setdefault(cell, []).append(out_dir)
+            cell = (cell[0]+step[0], cell[1]+step[1])
+            dirs.setdefault(cell, []).append(in_dir)
+    shapes = {('n','s'): '|', ('e','w'): '-', ('n','e'): 'L', ('n','w'): 'J', ('s','w'): '7', ('e','s'): 'F'}
+    grid = [[rng.choice('|-LJ7F..') for _ in range(width)] for _ in range(height)]
+    for (row, col), cell_dirs in dirs.items():
+        grid[row][col] = shapes[tuple(sorted(cell_dirs, key='nesw'.index))]
+    start = rng.choice(sorted(dirs))
+    grid[start[0]][start[1]] = 'S'
+    # Junk pipes next to S could look connected to it, which would make S ambiguous
+    for dr, dc in ((0,1),(1,0),(0,-1),(-1,0)):
+        row, col = start[0]+dr, start[1]+dc
+        if 0 <= row < height and 0 <= col < width and (row, col) not in dirs:
+            grid[row][col] = '.'
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+def gen_day11(rng, scale):
+    size = side(140, scale)
+    empty_rows = set(rng.sample(range(size), size // 10))
+    empty_cols = set(rng.sample(range(size), size // 10))
+    grid = [['#' if row not in empty_rows and col not in empty_cols and rng.random() < 0.02 else '.'
+             for col in range(size)] for row in range(size)]
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+def gen_day12(rng, scale):
+    lines = []
+    for _ in range(count(1000, scale)):
+        springs = ''.join(rng.choices('.#', k=rng.randint(5, 20)))
+        groups = [len(group) for group in springs.split('.') if group]
+        if not groups:
+            springs, groups = '#' + springs[1:], [1]
+            groups = [len(group) for group in springs.split('.') if group]
+        masked = ''.join('?' if rng.random() < 0.4 else char for char in springs)
+        lines.append(f'{masked} {",".join(str(g) for g in groups)}')
+    return '\n'.join(lines) + '\n'
+
+def gen_day13(rng, scale):
+    patterns = []
+    for _ in range(count(100, scale)):
+        height, width = rng.randint(5, 17), rng.randint(5, 17)
+        rows = [[rng.choice('.#') for _ in range(width)] for _ in range(height)]
+        # Mirror across a random line, then maybe add a smudge so only the second star sees it
+        if rng.random() < 0.5:
+            line = rng.randint(1, height-1)
+            for offset in range(min(line, height-line)):
+                rows[line+offset] = rows[line-offset-1][:]
+        else:
+            line = rng.randint(1, width-1)
+            for row in rows:
+                for offset in range(min(line, width-line)):
+                    row[line+offset] = row[line-offset-1]
+        if rng.random() < 0.5:
+            row, col = rng.randrange(height), rng.randrange(width)
+            rows[row][col] = '#' if rows[row][col] == '.' else '.'
+        patterns.append('\n'.join(''.join(row) for row in rows))
+    return '\n\n'.join(patterns) + '\n'
+
+def gen_day14(rng, scale):
+    size = side(100, scale)
+    return '\n'.join(''.join(rng.choices('O#.', weights=(2, 1, 5), k=size)) for _ in range(size)) + '\n'
+
+def gen_day15(rng, scale):
+    labels = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 6))) for _ in range(count(500, scale))]
+    steps = []
+    for _ in range(count(4000, scale)):
+        label = rng.choice(labels)
+        steps.append(f'{label}-' if rng.random() < 0.3 else f'{label}={rng.randint(1, 9)}')
+    return ','.join(steps) + '\n'
+
+def gen_day16(rng, scale):
+    size = side(110, scale)
+    return '\n'.join(''.join(rng.choices('./\\|-', weights=(90, 3, 3, 2, 2), k=size)) for _ in range(size)) + '\n'
+
+def gen_day17(rng, scale):
+    size = side(141, scale)
+    return '\n'.join(''.join(rng.choices('123456789', k=size)) for _ in range(size)) + '\n'
+
+def monotone_coords(rng, n, low, high):
+    'n strictly increasing integers starting at 0, each gap in [low, high].'
+    coords = [0]
+    for _ in range(n-1):
+        coords.append(coords[-1] + rng.randint(low, high))
+    return coords
+
+def gen_day18(rng, scale):
+    # A simple rectilinear loop, stretched two different ways: small steps for the plan and huge
+    # steps for the colors. Stretching each axis monotonically keeps the loop simple.
+    size = side(12, scale, 2)
+    order = loop_order(spanning_tree_loop(rng, size, size))
+    # Day 18's first star digs in a 2000x2000 arena around its start, so keep each axis under 1000
+    step = max(1, min(10, 999 // (2*size)))
+    plan_rows, plan_cols = monotone_coords(rng, 2*size, 1, step), monotone_coords(rng, 2*size, 1, step)
+    # Colors hold five hex digits of length
+    color_step = 0xfffff // (2*size)
+    color_rows, color_cols = monotone_coords(rng, 2*size, 1, color_step), monotone_coords(rng, 2*size, 1, color_step)
+    lines = []
+    codes = {'R': 0, 'D': 1, 'L': 2, 'U': 3}
+    vertices = loop_corners(order)
+    for (r1, c1), (r2, c2) in zip(vertices, vertices[1:]):
+        if r1 == r2:
+            direction = 'R' if c2 > c1 else 'L'
+            length, color_length = abs(plan_cols[c2] - plan_cols[c1]), abs(color_cols[c2] - color_cols[c1])
+        else:
+            direction = 'D' if r2 > r1 else 'U'
+            length, color_length = abs(plan_rows[r2] - plan_rows[r1]), abs(color_rows[r2] - color_rows[r1])
+        lines.append(f'{direction} {length} (#{color_length:05x}{codes[direction]})')
+    return '\n'.join(lines) + '\n'
+
+def gen_day19(rng, scale):
+    letters = string.ascii_lowercase
+    names = ['in'] + rng.sample([a+b+c for a in letters for b in letters for c in letters if a+b+c != 'in'],
+                                count(550, scale, 2))
+    workflows = []
+    for idx, name in enumerate(names):
+        # Only point at later workflows so there are no loops
+        later = names[idx+1:]
+        def dest():
+            return rng.choice(later) if later and rng.random() < 0.7 else rng.choice('AR')
+        steps = [f'{rng.choice("xmas")}{rng.choice("<>")}{rng.randint(1, 4000)}:{dest()}' for _ in range(rng.randint(1, 4))]
+        workflows.append(f'{name}{{{",".join(steps + [dest()])}}}')
+    parts = [f'{{x={rng.randint(1, 4000)},m={rng.randint(1, 4000)},a={rng.randint(1, 4000)},s={rng.randint(1, 4000)}}}'
+             for _ in range(count(200, scale))]
+    return '\n'.join(workflows) + '\n\n' + '\n'.join(parts) + '\n'
+
+def gen_day20(rng, scale):
+    # The real network: four binary counters that each reset after an odd period. A counter is a
+    # chain of flip-flops; bits set in the period feed a conjunction hub, which feeds back into the
+    # clear bits and into an inverter. Day 20's second star expects the inverters cl, rp, lb and nj
+    # to feed lx, which feeds rx.
+    bits = 12 + max(0, int(log2(max(scale, 1))))
+    reserved = {'cl', 'rp', 'lb', 'nj', 'lx', 'rx'}
+    names = iter(name for name in rng.sample([a+b for a in string.ascii_lowercase for b in string.ascii_lowercase], 676)
+                 if name not in reserved)
+    lines = []
+    firsts = []
+    for inverter in ('cl', 'rp', 'lb', 'nj'):
+        period = rng.randrange(2**(bits-1)+1, 2**bits, 2)
+        chain = [next(names) for _ in range(bits)]
+        hub = next(names)
+        firsts.append(chain[0])
+        hub_dests = []
+        for bit, flip_flop in enumerate(chain):
+            dests = [chain[bit+1]] if bit+1 < bits else []
+            if period >> bit & 1:
+                dests.append(hub)
+            if not period >> bit & 1 or bit == 0:
+                hub_dests.append(flip_flop)
+            lines.append(f'%{flip_flop} -> {", ".join(dests)}')
+        lines.append(f'&{hub} -> {", ".join(hub_dests + [inverter])}')
+        lines.append(f'&{inverter} -> lx')
+    lines.append('&lx -> rx')
+    lines.append(f'broadcaster -> {", ".join(firsts)}')
+    rng.shuffle(lines)
+    return '\n'.join(lines) + '\n'
+
+def gen_day21(rng, scale):
+    # Odd sized with S in the middle and clear middle row, middle column and border, like the real input
+    size = side(131, scale) | 1
+    middle = size // 2
+    grid = [['#' if rng.random() < 0.15 else '.' for _ in range(size)] for _ in range(size)]
+    for idx in range(size):
+        grid[middle][idx] = grid[idx][middle] = '.'
+        grid[0][idx] = grid[-1][idx] = grid[idx][0] = grid[idx][-1] = '.'
+    grid[middle][middle] = 'S'
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+def gen_day22(rng, scale):
+    width = side(10, scale, 3)
+    height = count(300, scale, 10)
+    occupied = set()
+    lines = []
+    for _ in range(count(1400, scale)):
+        for _ in range(100):
+            axis = rng.randrange(3)
+            length = rng.randint(0, 4)
+            start = [rng.randrange(width), rng.randrange(width), rng.randint(1, height-1)]
+            end = start[:]
+            end[axis] = start[axis] + length
+            if end[0] >= width or end[1] >= width or end[2] >= height:
+                continue
+            cells = {(x, y, z) for x in range(start[0], end[0]+1) for y in range(start[1], end[1]+1) for z in range(start[2], end[2]+1)}
+            if cells & occupied:
+                continue
+            occupied |= cells
+            lines.append(f'{start[0]},{start[1]},{start[2]}~{end[0]},{end[1]},{end[2]}')
+            break
+    return '\n'.join(lines) + '\n'
+
+def gen_day23(rng, scale):
+    # Junctions on a lattice, joined by corridors going right or down, with slopes at both ends of
+    # each corridor so the first star's graph is acyclic. Day 23 never links two adjacent
+    # junctions, so the start and goal each get a corridor cell before the nearest junction.
+    junctions = side(6, scale, 2)
+    rows = [2 + offset for offset in monotone_coords(rng, junctions, 4, 40)]
+    cols = [1 + offset for offset in monotone_coords(rng, junctions, 4, 40)]
+    height, width = rows[-1] + 3, cols[-1] + 2
+    grid = [['#'] * width for _ in range(height)]
+    for row in range(rows[0]):
+        grid[row][1] = '.'
+    for row in range(rows[-1], height):
+        grid[row][width-2] = '.'
+    for idx, row in enumerate(rows):
+        for col in range(cols[0], cols[-1]+1):
+            grid[row][col] = '.'
+        for col in cols[1:]:
+            grid[row][col-1] = '>'
+        for col in cols[:-1]:
+            grid[row][col+1] = '>'
+    for col in cols:
+        for row in range(rows[0], rows[-1]+1):
+            if grid[row][col] == '#':
+                grid[row][col] = '.'
+        for row in rows[1:]:
+            grid[row-1][col] = 'v'
+        for row in rows[:-1]:
+            grid[row+1][col] = 'v'
+    return '\n'.join(''.join(row) for row in grid) + '\n'
+
+def gen_day24(rng, scale):
+    # A rock with integer position and velocity, and hailstones that each meet it at an integer time
+    rock_pos = [rng.randint(2*10**14, 4*10**14) for _ in range(3)]
+    rock_vel = [rng.randint(-300, 300) for _ in range(3)]
+    times = rng.sample(range(10**11, 10**12), count(300, scale, 3))
+    lines = []
+    for time in times:
+        vel = [rng.randint(-300, 300) for _ in range(3)]
+        while vel[0] == 0 or vel[0] == rock_vel[0]:
+            vel[0] = rng.randint(-300, 300)
+        pos = [p + (v - hv) * time for p, v, hv in zip(rock_pos, rock_vel, vel)]
+        lines.append(f'{pos[0]}, {pos[1]}, {pos[2]} @ {vel[0]}, {vel[1]}, {vel[2]}')
+    return '\n'.join(lines) + '\n'
+
+def gen_day25(rng, scale):
+    # Two well connected halves joined by exactly three wires
+    letters = string.ascii_lowercase
+    nodes = rng.sample([a+b+c for a in letters for b in letters for c in letters], count(1500, scale, 16))
+    halves = nodes[:len(nodes)//2], nodes[len(nodes)//2:]
+    edges = set()
+    for half in halves:
+        # A ring plus random chords keeps every cut inside a half well above three edges
+        for offset in (1, 2, 3):
+            for idx, node in enumerate(half):
+                edges.add(frozenset((node, half[(idx+offset) % len(half)])))
+        for _ in range(len(half)):
+            a, b = rng.sample(half, 2)
+            edges.add(frozenset((a, b)))
+    for a, b in zip(rng.sample(halves[0], 3), rng.sample(halves[1], 3)):
+        edges.add(frozenset((a, b)))
+    adjacency = {}
+    for edge in edges:
+        a, b = sorted(edge)
+        adjacency.setdefault(a, []).append(b)
+    return '\n'.join(f'{source}: {" ".join(dests)}' for source, dests in adjacency.items()) + '\n'
+
+GENERATORS = {day: globals()[f'gen_day{day:02d}'] for day in range(1, 26)}
+
+def generate(day, scale=1, seed=0):
+    # Seed per day so generating one day gives the same text as generating it alongside others
+    return GENERATORS[day](random.Random(f'{day}-{seed}'), scale)
+
+def run_solver(tree, day, input_text, timeout):
+    'Run a day\'s script from a source tree on input_text, returning its stdout.'
+    script = Path(tree) / (day_module_name(day).replace('.', '/') + '.py')
+    with tempfile.TemporaryDirectory() as case_dir:
+        # Older trees read input.txt from the working directory, so always use that name
+        (Path(case_dir) / 'input.txt').write_text(input_text)
+        try:
+            result = subprocess.run([sys.executable, str(script), 'input.txt'], cwd=case_dir,
+                                    capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return 'timed out'
+    return result.stdout if result.returncode == 0 else f'failed: {result.stderr.strip().splitlines()[-1]}'
+
+def cross_check(days, reference, cases, scale, timeout):
+    'Compare the working tree against a git revision on small generated inputs. Returns the mismatches.'
+    mismatches = []
+    with tempfile.TemporaryDirectory() as reference_tree:
+        archive = subprocess.run(['git', 'archive', reference], cwd=ROOT, capture_output=True, check=True)
+        subprocess.run(['tar', '-x', '-C', reference_tree], input=archive.stdout, check=True)
+        for day in days:
+            for seed in range(cases):
+                text = generate(day, scale, seed)
+                expected = run_solver(reference_tree, day, text, timeout)
+                actual = run_solver(ROOT, day, text, timeout)
+                status = 'ok' if actual == expected else 'MISMATCH'
+                print(f'Day {day:02d} seed {seed}: {status}')
+                if actual != expected:
+                    mismatches.append((day, seed, expected, actual))
+    return mismatches
+
+def main(args):
+    days = parse_days(args.days)
+    if args.check:
+        mismatches = cross_check(days, args.reference, args.cases, args.scale, args.timeout)
+        for day, seed, expected, actual in mismatches:
+            print(f'Day {day:02d} seed {seed}: expected {expected!r}, got {actual!r}')
+        return 1 if mismatches else 0
+
+    for day in days:
+        text = generate(day, args.scale, args.seed)
+        if args.output:
+            output = Path(args.output.format(day=day))
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(text)
+        else:
+            sys.stdout.write(text)
+    return 0
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Generate seeded synthetic inputs at any scale of the real puzzles')
+    parser.add_argument('days', nargs='*', help='days to generate, e.g. 5, 1-25 or 3,7 (default: all)')
+    parser.add_argument('--scale', type=float, default=1, help='size relative to the real puzzle input')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help='output path pattern, formatted with the day number (default: stdout)')
+    parser.add_argument('--check', action='store_true', help='cross-check solvers against --reference on small cases')
+    parser.add_argument('--reference', default='HEAD', help='git revision holding the reference solvers')
+    parser.add_argument('--cases', type=int, default=3, help='generated cases per day for --check')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds allowed per solver run for --check')
+    sys.exit(main(parser.parse_args()))
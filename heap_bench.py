@@ -0,0 +1,102 @@
+from argparse import ArgumentParser
+from heapq import heappush, heappop
+import itertools
+import random
+import time
+import tracemalloc
+from utils import IndexedHeap
+
+# The tombstone helpers Day17 and Day22 used before IndexedHeap, kept here as the baseline
+REMOVED = '<removed-node>'
+
+def add_node(pq, entry_finder, counter, node, distance=0):
+    if node in entry_finder:
+        remove_node(entry_finder, node)
+    entry = [distance, next(counter), node]
+    entry_finder[node] = entry
+    heappush(pq, entry)
+
+def remove_node(entry_finder, node):
+    entry = entry_finder.pop(node)
+    entry[-1] = REMOVED
+
+def pop_node(pq, entry_finder):
+    while pq:
+        distance, count, node = heappop(pq)
+        if node is not REMOVED:
+            del entry_finder[node]
+            return distance, node
+    raise KeyError('pop from an empty priority queue')
+
+def random_grid(size, seed):
+    rng = random.Random(seed)
+    return [rng.randint(1, 9) for _ in range(size*size)]
+
+def neighbors(node, size):
+    row, col = divmod(node, size)
+    if row:
+        yield node - size
+    if row < size-1:
+        yield node + size
+    if col:
+        yield node - 1
+    if col < size-1:
+        yield node + 1
+
+def dijkstra_tombstones(weights, size):
+    'Every node queued up front at infinity, like Day17, with updates leaving dead entries behind.'
+    queue, entry_finder, counter = [], {}, itertools.count()
+    for node in range(size*size):
+        add_node(queue, entry_finder, counter, node, 0 if node == 0 else float('inf'))
+    distances = {}
+    while entry_finder:
+        dist, node = pop_node(queue, entry_finder)
+        distances[node] = dist
+        for neighbor in neighbors(node, size):
+            if neighbor in entry_finder and dist + weights[neighbor] < entry_finder[neighbor][0]:
+                add_node(queue, entry_finder, counter, neighbor, dist + weights[neighbor])
+    return distances[size*size-1]
+
+def dijkstra_indexed(weights, size):
+    queue = IndexedHeap([0] + [float('inf')] * (size*size-1))
+    while queue:
+        dist, node = queue.pop()
+        for neighbor in neighbors(node, size):
+            if neighbor in queue and dist + weights[neighbor] < queue.priority(neighbor):
+                queue.decrease_key(neighbor, dist + weights[neighbor])
+    return queue.priority(size*size-1)
+
+def best_time(func, args, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def peak_memory(func, args):
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def main(sizes, repeat, seed):
+    for size in sizes:
+        weights = random_grid(size, seed)
+        old, old_answer = best_time(dijkstra_tombstones, (weights, size), repeat)
+        new, new_answer = best_time(dijkstra_indexed, (weights, size), repeat)
+        if old_answer != new_answer:
+            raise AssertionError(f'{size}x{size}: tombstones gave {old_answer}, IndexedHeap gave {new_answer}')
+        old_peak = peak_memory(dijkstra_tombstones, (weights, size))
+        new_peak = peak_memory(dijkstra_indexed, (weights, size))
+        print(f'{size:4}x{size:<4}  tombstones {old:8.4f}s {old_peak/2**20:7.2f} MiB'
+              f'  IndexedHeap {new:8.4f}s {new_peak/2**20:7.2f} MiB  time ratio {new/old:5.2f}x')
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Grid Dijkstra with the old tombstone heap helpers against utils.IndexedHeap')
+    parser.add_argument('sizes', nargs='*', type=int, default=[50, 141, 300])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat, args.seed)
@@ -0,0 +1,141 @@
+from argparse import ArgumentParser
+from dataclasses import dataclass
+import re
+import sys
+import tracemalloc
+from generate import generate
+from utils import all_ints, day_module
+
+# The record types as they were before slots and integer codes, kept here as the baseline
+
+@dataclass
+class OldEnginePart():
+    value: int
+    row: int
+    left: int
+    right: int
+
+@dataclass(frozen=True)
+class OldBeam:
+    start: int
+    dir: int
+
+@dataclass
+class OldInstruction:
+    direction: str
+    length: int
+    color: str
+
+@dataclass
+class OldPart:
+    x: int
+    m: int
+    a: int
+    s: int
+
+@dataclass
+class OldPulse:
+    source: str
+    dest: str
+    value: str
+
+@dataclass(frozen=True)
+class OldBlock:
+    idy: int
+    xrange: range
+    yrange: range
+    zrange: range
+
+@dataclass(frozen=True)
+class OldHailstone:
+    px: int
+    py: int
+    pz: int
+    vx: int
+    vy: int
+    vz: int
+
+@dataclass(frozen=True)
+class OldPoint:
+    x: float
+    y: float
+    z: float
+    t: float
+
+def engine_parts(text):
+    return [(int(match.group()), row, match.start(), match.end()-1)
+            for row, line in enumerate(text.splitlines()) for match in re.finditer(r'\d+', line)]
+
+def beams(text):
+    lines = text.splitlines()
+    return [(cell, dir) for cell in range(len(lines) * len(lines[0])) for dir in range(4)]
+
+def instructions(text):
+    return [(split[0], int(split[1]), split[2][2:8]) for split in map(str.split, text.splitlines())]
+
+def parts(text):
+    return [tuple(all_ints(line)) for line in text.split('\n\n')[1].splitlines()]
+
+def pulses(text, presses=1000):
+    module = day_module(20)
+    modules = module.initialize_modules(text.splitlines())
+    sent = []
+    for _ in range(presses):
+        sent.extend((pulse.source, pulse.dest, pulse.value) for pulse in module.press_button(modules))
+    return sent
+
+def bricks(text):
+    return [(idy, *all_ints(line)) for idy, line in enumerate(text.splitlines(), start=1)]
+
+def hailstones(text):
+    return [tuple(all_ints(line)) for line in text.splitlines()]
+
+def points(text):
+    return [(float(px), float(py), float(pz), 0.5) for px, py, pz, *_ in hailstones(text)]
+
+def old_pulse(source, dest, value):
+    return OldPulse(source, dest, 'high' if value else 'low')
+
+def old_block(idy, x1, y1, z1, x2, y2, z2):
+    return OldBlock(idy, range(x1, x2+1), range(y1, y2+1), range(z1, z2+1))
+
+# name: (day, constructor arguments from generated input text, baseline record, current record's name in the day)
+RECORDS = {
+    'EnginePart': (3, engine_parts, OldEnginePart, 'EnginePart'),
+    'Beam': (16, beams, OldBeam, 'Beam'),
+    'Instruction': (18, instructions, OldInstruction, 'Instruction'),
+    'Part': (19, parts, OldPart, 'Part'),
+    'Pulse': (20, pulses, old_pulse, 'Pulse'),
+    'Block': (22, bricks, old_block, 'Block'),
+    'Hailstone': (24, hailstones, OldHailstone, 'Hailstone'),
+    'Point': (24, points, OldPoint, 'Point'),
+}
+
+def bytes_per_record(make, args):
+    'Bytes traced while building one record per argument tuple, less the list holding them.'
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [make(*arg) for arg in args]
+    used = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(records)
+    tracemalloc.stop()
+    return used / len(records)
+
+def main(names, scale, seed):
+    for name in names:
+        day, arguments, old, new = RECORDS[name]
+        args = arguments(generate(day, scale, seed))
+        old_bytes = bytes_per_record(old, args)
+        new_bytes = bytes_per_record(getattr(day_module(day), new), args)
+        print(f'Day {day:02d} {name:<12} {len(args):9} records  before {old_bytes:7.1f} B  after {new_bytes:7.1f} B'
+              f'  saved {1 - new_bytes/old_bytes:6.1%}')
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Bytes per record of the per-item record types before and after slots')
+    parser.add_argument('records', nargs='*', help=f'record types to measure (default: all of {", ".join(RECORDS)})')
+    parser.add_argument('--scale', type=float, default=10, help='size of the generated inputs relative to the real puzzles')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    unknown = set(args.records) - set(RECORDS)
+    if unknown:
+        parser.error(f'unknown record types: {", ".join(sorted(unknown))}')
+    main(args.records or list(RECORDS), args.scale, args.seed)
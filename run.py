@@ -0,0 +1,188 @@
+from argparse import ArgumentParser
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from utils import ROOT, day_module, engine_names, parse_days
+
+def select_engine(module, engine):
+    if engine:
+        if engine not in engine_names(module):
+            raise SystemExit(f'{module.__name__} has no engine {engine!r}, it offers: {", ".join(engine_names(module)) or "none"}')
+        module.ENGINES.select(engine)
+
+def solve(day, input_file, engine=None):
+    module = day_module(day)
+    select_engine(module, engine)
+    data = module.read_input(input_file)
+    module.main(data)
+
+def solve_batch(day, directory, pattern='*', engine=None):
+    '''
+    Solve every input in directory with one day's solver, all in this process so imports, compiled
+    regexes and function caches carry over from one file to the next. Yields (path, answers, seconds).
+    '''
+    module = day_module(day)
+    select_engine(module, engine)
+    for input_file in sorted(path for path in Path(directory).glob(pattern) if path.is_file()):
+        start = time.perf_counter()
+        answers = module.solve(module.read_input(input_file))
+        yield input_file, answers, time.perf_counter() - start
+
+def default_input(day):
+    return ROOT / f'Day{day:02d}' / 'input.txt'
+
+def solve_star(day, star, input_file, conn):
+    'Pool worker: parse the input and solve one star, sending the answer back over conn.'
+    start = time.perf_counter()
+    try:
+        module = day_module(day)
+        answer = getattr(module, star)(module.read_input(input_file))
+        conn.send(('ok', answer, time.perf_counter() - start))
+    except Exception as error:
+        conn.send(('error', repr(error), time.perf_counter() - start))
+    finally:
+        conn.close()
+
+def expected_durations(timings_file):
+    'Median parse + star seconds per (day, star) from a bench.py --json file, or nothing if there is none.'
+    if not timings_file or not os.path.exists(timings_file):
+        return {}
+    with open(timings_file, 'r') as input:
+        timings = json.load(input)
+    durations = {}
+    for day, phases in timings.items():
+        # bench.py --compare-engines results are keyed day:engine and are not one day's default run
+        if not day.isdigit():
+            continue
+        parse = phases.get('parse', {}).get('median', 0)
+        for star in ('star1', 'star2'):
+            if star in phases:
+                durations[(int(day), star)] = parse + phases[star]['median']
+    return durations
+
+def solve_all(days, input_pattern=None, jobs=None, timeout=None, timings_file=None):
+    '''
+    Solve every star of every day on a pool of worker processes, longest expected first, printing
+    answers as they arrive. Workers that run past timeout seconds are killed. Returns whether
+    everything finished without errors or timeouts.
+    '''
+    # Only the pool needs these, so single day runs do not pay to import them
+    import multiprocessing
+    from multiprocessing.connection import wait
+    tasks = []
+    for day in days:
+        input_file = input_pattern.format(day=day) if input_pattern else default_input(day)
+        if not os.path.exists(input_file):
+            print(f'Day {day:02d}: skipped, {input_file} not found', flush=True)
+            continue
+        for star in ('star1', 'star2'):
+            if hasattr(day_module(day), star):
+                tasks.append((day, star, input_file))
+    durations = expected_durations(timings_file)
+    # Unknown days go first since they could be the slowest of all
+    tasks.sort(key=lambda task: -durations.get(task[:2], float('inf')))
+
+    jobs = jobs or os.cpu_count()
+    running = {}
+    success = True
+    wall_start = time.perf_counter()
+    while tasks or running:
+        while tasks and len(running) < jobs:
+            day, star, input_file = tasks.pop(0)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=solve_star, args=(day, star, input_file, sender), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (day, star, process, time.perf_counter())
+
+        now = time.perf_counter()
+        next_deadline = min(started + timeout for *_, started in running.values()) - now if timeout else None
+        for receiver in wait(list(running), timeout=max(0, next_deadline) if timeout else None):
+            day, star, process, _ = running.pop(receiver)
+            try:
+                status, answer, seconds = receiver.recv()
+            except EOFError:
+                status, answer, seconds = 'error', f'worker exited with code {process.exitcode}', time.perf_counter() - now
+            process.join()
+            if status == 'ok':
+                print(f'Day {day:02d} {star}: {answer}  ({seconds:.2f}s)', flush=True)
+            else:
+                print(f'Day {day:02d} {star}: failed, {answer}', flush=True)
+                success = False
+
+        if timeout:
+            now = time.perf_counter()
+            for receiver, (day, star, process, started) in list(running.items()):
+                if now - started > timeout:
+                    process.kill()
+                    process.join()
+                    del running[receiver]
+                    print(f'Day {day:02d} {star}: timed out after {timeout:g}s', flush=True)
+                    success = False
+
+    print(f'All done in {time.perf_counter() - wall_start:.2f}s')
+    return success
+
+def import_times(argv, top=15):
+    '''
+    Rerun this command under -X importtime and summarize the slowest top level imports, including
+    ones a solver only makes once it reaches the code that needs them.
+    '''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'run'] + argv, cwd=ROOT,
+                            capture_output=True, text=True)
+    sys.stdout.write(result.stdout)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, self_us, cumulative_us, name = (field for field in line.replace('import time:', '|', 1).split('|'))
+        # Nested imports are indented two spaces per level under the module that imported them
+        if len(name) - len(name.lstrip()) == 1:
+            imports.append((int(cumulative_us), name.strip()))
+    total = sum(cumulative for cumulative, _ in imports)
+    print(f'Imports: {total/1000:.1f} ms total')
+    for cumulative, name in sorted(imports, reverse=True)[:top]:
+        print(f'{cumulative/1000:10.1f} ms  {name}')
+    return result.returncode
+
+def main(args, argv):
+    if args.import_times:
+        return import_times([arg for arg in argv if arg != '--import-times'])
+    if args.all:
+        return 0 if solve_all(parse_days(args.days), args.input, args.jobs, args.timeout, args.timings) else 1
+    if args.day is None:
+        raise SystemExit('give a day to run, or --all')
+    if args.batch:
+        for input_file, answers, seconds in solve_batch(args.day, args.batch, args.pattern, args.engine):
+            print(f'{input_file.name}: {" ".join(map(str, answers))}  ({seconds:.2f}s)', flush=True)
+        return 0
+    input_file = args.input_file or default_input(args.day)
+    if args.daemon:
+        import daemon
+        for answer in daemon.solve(args.day, input_file, engine=args.engine).values():
+            print(answer)
+    else:
+        solve(args.day, input_file, args.engine)
+    return 0
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Run one day\'s solver, importing only what that day needs')
+    parser.add_argument('day', type=int, nargs='?')
+    parser.add_argument('input_file', nargs='?', help='defaults to DayNN/input.txt')
+    parser.add_argument('--engine', help='implementation to run, for days that offer several')
+    parser.add_argument('--daemon', action='store_true', help='ask a running daemon.py for the answers, solving here if none is running')
+    parser.add_argument('--import-times', action='store_true', help='report how long each top level import took')
+    batch = parser.add_argument_group('batch', 'solve one day over many inputs in a single process')
+    batch.add_argument('--batch', metavar='DIR', help='directory of inputs to solve the day over')
+    batch.add_argument('--pattern', default='*', help='glob of input file names in the batch directory (default: all files)')
+    pool = parser.add_argument_group('all days', 'solve many days at once on a process pool')
+    pool.add_argument('--all', action='store_true', help='solve every star of every selected day in parallel')
+    pool.add_argument('--days', nargs='*', help='days for --all, e.g. 1-25 or 3,7 (default: all)')
+    pool.add_argument('--input', help='input path pattern for --all, formatted with the day number')
+    pool.add_argument('--jobs', type=int, help='worker processes (default: one per CPU)')
+    pool.add_argument('--timeout', type=float, help='seconds before a star is killed')
+    pool.add_argument('--timings', default='bench.json', help='bench.py --json results used to start the slowest stars first')
+    sys.exit(main(parser.parse_args(), sys.argv[1:]))
@@ -0,0 +1,97 @@
+from collections import deque
+from heapq import heappush, heappop
+from utils import METRICS
+
+# Searches over integer state ids 0..size-1. Neighbours come from a function of the state, so any
+# numbering works: GridGraph cells, or flat indexes of (cell, direction, streak) tuples.
+
+def bfs(size, sources, neighbors):
+    'Step counts from the nearest source to every state, -1 where unreachable. neighbors(state) lists states one step away.'
+    distances = [-1] * size
+    queue = deque(sources)
+    for source in sources:
+        distances[source] = 0
+    while queue:
+        state = queue.popleft()
+        next_dist = distances[state] + 1
+        for neighbor in neighbors(state):
+            if distances[neighbor] == -1:
+                distances[neighbor] = next_dist
+                queue.append(neighbor)
+    return distances
+
+def dial(size, sources, edges, max_weight, is_goal=None):
+    '''
+    Dijkstra with a circular array of buckets in place of a heap, for integer edge weights from 1
+    to max_weight. edges(state) yields (neighbor, weight) pairs. Returns the distance to every state,
+    inf where unreachable, stopping early once a state satisfying is_goal is settled.
+    '''
+    distances = [float('inf')] * size
+    buckets = [[] for _ in range(max_weight + 1)]
+    for source in sources:
+        distances[source] = 0
+        buckets[0].append(source)
+    pending = len(sources)
+    settled = stale = 0
+    dist = 0
+    while pending:
+        bucket = buckets[dist % len(buckets)]
+        while bucket:
+            state = bucket.pop()
+            pending -= 1
+            # A state is left behind in an older bucket whenever a shorter path to it turns up
+            if distances[state] != dist:
+                stale += 1
+                continue
+            settled += 1
+            if is_goal is not None and is_goal(state):
+                pending = 0
+                break
+            for neighbor, weight in edges(state):
+                new_dist = dist + weight
+                if new_dist < distances[neighbor]:
+                    distances[neighbor] = new_dist
+                    buckets[new_dist % len(buckets)].append(neighbor)
+                    pending += 1
+        dist += 1
+    METRICS.add('states_settled', settled)
+    METRICS.add('stale_entries_skipped', stale)
+    return distances
+
+def astar(sources, edges, heuristic, is_goal):
+    '''
+    Shortest distance from any source to a state satisfying is_goal, or None if there is none.
+    heuristic(state) must never overestimate the remaining distance.
+    '''
+    best = {}
+    queue = []
+    for source in sources:
+        best[source] = 0
+        heappush(queue, (heuristic(source), 0, source))
+    expanded = 0
+    while queue:
+        _, dist, state = heappop(queue)
+        if dist > best[state]:
+            continue
+        expanded += 1
+        if is_goal(state):
+            METRICS.add('states_expanded', expanded)
+            return dist
+        for neighbor, weight in edges(state):
+            new_dist = dist + weight
+            if new_dist < best.get(neighbor, new_dist + 1):
+                best[neighbor] = new_dist
+                heappush(queue, (new_dist + heuristic(neighbor), new_dist, neighbor))
+    METRICS.add('states_expanded', expanded)
+    return None
+
+def manhattan(width, goal, min_weight=1, cell=None):
+    '''
+    A* heuristic for grids: Manhattan distance from a state's cell to the goal cell times the
+    smallest edge weight. cell(state) gives a state's GridGraph cell id, if states are not cells.
+    '''
+    goal_row, goal_col = divmod(goal, width)
+    def heuristic(state):
+        row, col = divmod(state if cell is None else cell(state), width)
+        return (abs(goal_row - row) + abs(goal_col - col)) * min_weight
+    return heuristic
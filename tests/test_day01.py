@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import day_module
+
+# The puzzle's part 2 example, where some lines only spell their digits
+EXAMPLE = '''two1nine
+eightwothree
+abcone2threexyz
+xtwone3four
+4nineeightseven2
+zoneight234
+7pqrstsixteen
+'''
+
+def test_stream_matches_solve():
+    trebuchet = day_module(1)
+    stream = trebuchet.Stream()
+    for line in EXAMPLE.splitlines():
+        stream.feed(line)
+    assert stream.answers() == trebuchet.solve(EXAMPLE.encode()) == (209, 281)
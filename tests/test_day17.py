@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+import numpy as np
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import day_module, grid_view
+
+# The puzzle's example, where every engine has to find 102 and 94
+EXAMPLE = b'''2413432311323
+3215453535623
+3255245654254
+3446585845452
+4546657867536
+1438598798454
+4457876987766
+3637877979653
+4654967986887
+4564679986453
+1224686865563
+2546548887735
+4322674655533
+'''
+
+def test_engines_agree_on_example():
+    crucible = day_module(17)
+    city = grid_view(np.frombuffer(EXAMPLE, dtype=np.uint8))
+    try:
+        for engine in crucible.ENGINES.names():
+            crucible.ENGINES.select(engine)
+            assert crucible.solve(city) == (102, 94), engine
+    finally:
+        crucible.ENGINES.select()
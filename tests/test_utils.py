@@ -0,0 +1,12 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils import brent, find_cycle
+
+def test_brent_matches_find_cycle():
+    # x -> x*x + 1 mod m runs into a cycle after a prefix that depends on the start
+    for modulus in (7, 97, 1009, 65537):
+        for start in range(5):
+            step = lambda x: (x*x + 1) % modulus
+            cycle = find_cycle(start, step, encode=lambda x: x, metric=lambda x: x)
+            assert brent(start, step) == (cycle.prefix, cycle.period)
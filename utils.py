@@ -1,5 +1,774 @@
+import functools
+import hashlib
+import mmap
+import os
+import pickle
 import re
+import sys
+from pathlib import Path
+
+INT_PATTERN = re.compile(r'-?\d+')
+BYTES_INT_PATTERN = re.compile(rb'-?\d+')
 
-# Does not match negatives!
 def all_ints(s):
-    return [int(i) for i in re.findall(r'\b\d+\b', s)]
+    'Every signed integer in a str or bytes-like object (bytes, memoryview, mmap).'
+    pattern = INT_PATTERN if isinstance(s, str) else BYTES_INT_PATTERN
+    return [int(i) for i in pattern.findall(s)]
+
+def parse_ints(raw):
+    '''
+    Every signed integer in a uint8 buffer, found with array operations instead of a regex per line.
+    Returns an int64 array of the values and the offsets of each line's values, so line i
+    holds values[offsets[i]:offsets[i+1]]. Numbers are assumed to fit in 18 digits.
+    '''
+    import numpy as np
+    is_digit = (raw >= ord('0')) & (raw <= ord('9'))
+    digit_idx = is_digit.nonzero()[0]
+    # A number starts wherever a digit does not directly follow the previous digit
+    starts = np.ones(len(digit_idx), dtype=bool)
+    starts[1:] = digit_idx[1:] != digit_idx[:-1] + 1
+    start_pos = starts.nonzero()[0]
+    number_id = np.cumsum(starts) - 1
+    ends = np.append(start_pos[1:], len(digit_idx))
+    place = ends[number_id] - np.arange(len(digit_idx)) - 1
+    digits = raw[digit_idx].astype(np.int64) - ord('0')
+    values = np.add.reduceat(digits * 10**place, start_pos) if len(start_pos) else np.zeros(0, dtype=np.int64)
+
+    first_char = digit_idx[start_pos]
+    negative = (first_char > 0) & (raw[np.maximum(first_char-1, 0)] == ord('-'))
+    values[negative] *= -1
+
+    newlines = (raw == ord('\n')).nonzero()[0]
+    line_count = len(newlines) + (1 if len(raw) and raw[-1] != ord('\n') else 0)
+    line_of_value = np.searchsorted(newlines, first_char)
+    offsets = np.searchsorted(line_of_value, np.arange(line_count+1))
+    return values, offsets
+
+def read_ints(input_file):
+    'parse_ints over the whole mapped file in one pass.'
+    import numpy as np
+    return parse_ints(np.frombuffer(map_input(input_file), dtype=np.uint8))
+
+def map_input(input_file):
+    'Memory-map input_file read-only. Empty files give an empty bytes object since mmap refuses them.'
+    with open(input_file, 'rb') as input:
+        if os.fstat(input.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(input.fileno(), 0, access=mmap.ACCESS_READ)
+
+def iter_lines(input_file):
+    'Lazily yield stripped lines so a solver can start on the first line before the file is read.'
+    with open(input_file, 'r') as input:
+        for line in input:
+            yield line.strip()
+
+def read_lines(input_file):
+    'All stripped lines as a list, for solvers that index into or reread the data.'
+    return list(iter_lines(input_file))
+
+def line_views(input_file):
+    'memoryview slices of the mapped file, one per line, without allocating a str per line.'
+    buffer = map_input(input_file)
+    view = memoryview(buffer)
+    views = []
+    start = 0
+    end = len(buffer)
+    while start < end:
+        stop = buffer.find(b'\n', start)
+        if stop == -1:
+            stop = end
+        line_end = stop
+        while line_end > start and buffer[line_end-1] in b'\r \t':
+            line_end -= 1
+        views.append(view[start:line_end])
+        start = stop + 1
+    return views
+
+def read_blocks(input_file):
+    'Lists of stripped lines, split on blank lines.'
+    blocks = [[]]
+    for line in iter_lines(input_file):
+        if line:
+            blocks[-1].append(line)
+        elif blocks[-1]:
+            blocks.append([])
+    if not blocks[-1]:
+        blocks.pop()
+    return blocks
+
+def follow(input_file, separator='\n', poll=0.2):
+    '''
+    Stripped, non-empty tokens ended by separator as they arrive on stdin (input_file '-') or are
+    appended to a file, with None after each batch once the input has caught up. stdin ends at EOF
+    and the last unterminated token is yielded then; files are followed until interrupted.
+    '''
+    import time
+    separator = separator.encode()
+    stream = sys.stdin.buffer if input_file == '-' else open(input_file, 'rb')
+    pending = b''
+    try:
+        while True:
+            chunk = os.read(stream.fileno(), 1 << 16)
+            if chunk:
+                *tokens, pending = (pending + chunk).split(separator)
+                for token in tokens:
+                    if token.strip():
+                        yield token.strip().decode()
+                yield None
+            elif input_file == '-':
+                if pending.strip():
+                    yield pending.strip().decode()
+                    yield None
+                return
+            else:
+                time.sleep(poll)
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+# Byte values of the glyphs the grid puzzles use, for comparing against read_grid arrays
+DOT, HASH, STAR, START, ROUND = b'.#*SO'
+ZERO, NINE = b'09'
+PIPE, DASH, SLASH, BACKSLASH = b'|-/\\'
+NE_BEND, NW_BEND, SW_BEND, SE_BEND = b'LJ7F'
+SLOPE_N, SLOPE_E, SLOPE_S, SLOPE_W = b'^>v<'
+
+# Grid directions, in the order GridGraph lists each cell's neighbours
+NORTH, EAST, SOUTH, WEST = range(4)
+DIRECTION_OFFSETS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+class GridGraph:
+    '''
+    The cells of a (height, width) grid as integer ids row*width + col, with every cell's neighbours
+    precomputed in CSR form: cell's neighbours are indices[indptr[cell]:indptr[cell+1]] and
+    directions[...] says which way each of those edges goes. Only cells where passable is set are
+    connected, and moves(direction) may return a (height, width) mask of the cells allowed to step
+    that way, for pipes, slopes and other per-day rules.
+    '''
+    def __init__(self, shape, passable=None, moves=None) -> None:
+        import numpy as np
+        self.height, self.width = height, width = shape
+        cells = np.arange(height * width).reshape(shape)
+        sources, targets, directions = [], [], []
+        for direction, (row_offset, col_offset) in enumerate(DIRECTION_OFFSETS):
+            allowed = np.zeros(shape, dtype=bool)
+            allowed[max(0, -row_offset):height - max(0, row_offset), max(0, -col_offset):width - max(0, col_offset)] = True
+            if passable is not None:
+                # Both ends of the edge have to be passable
+                allowed &= passable
+                allowed &= np.roll(passable, (-row_offset, -col_offset), axis=(0, 1))
+            if moves is not None:
+                allowed &= moves(direction)
+            from_cells = cells[allowed]
+            sources.append(from_cells)
+            targets.append(from_cells + row_offset*width + col_offset)
+            directions.append(np.full(len(from_cells), direction, dtype=np.int8))
+        sources, targets, directions = np.concatenate(sources), np.concatenate(targets), np.concatenate(directions)
+        order = np.lexsort((directions, sources))
+        self.indptr = np.zeros(height*width + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=height*width), out=self.indptr[1:])
+        self.indices = targets[order]
+        self.directions = directions[order]
+
+    def cell(self, loc):
+        return loc[0]*self.width + loc[1]
+
+    def loc(self, cell):
+        return divmod(cell, self.width)
+
+    def degrees(self):
+        'Number of neighbours of each cell, as a (height, width) array.'
+        import numpy as np
+        return np.diff(self.indptr).reshape(self.height, self.width)
+
+    def adjacency(self):
+        'Neighbour lists of every cell as python lists, which index faster than arrays one cell at a time.'
+        indptr, indices = self.indptr.tolist(), self.indices.tolist()
+        return [indices[start:stop] for start, stop in zip(indptr, indptr[1:])]
+
+    def steps(self):
+        'Four lists, one per direction, of the cell one step that way from each cell, or -1 without an edge.'
+        import numpy as np
+        table = np.full((4, self.height * self.width), -1, dtype=np.int64)
+        sources = np.repeat(np.arange(self.height * self.width), np.diff(self.indptr))
+        table[self.directions, sources] = self.indices
+        return table.tolist()
+
+def grid_view(raw):
+    '(height, width) view of a 1d uint8 buffer of equal length lines. Newlines are skipped by striding, not copying.'
+    from numpy.lib.stride_tricks import as_strided
+    end = len(raw)
+    while end and raw[end-1] in b'\r\n':
+        end -= 1
+    if not end:
+        return raw[:0].reshape(0, 0)
+    # Only the first line is needed to learn the width, so avoid scanning the whole buffer for it
+    newline = bytes(raw[:min(end, 1 << 16)]).find(b'\n')
+    if newline == -1 and end > 1 << 16:
+        newlines = (raw[:end] == ord('\n')).nonzero()[0]
+        newline = int(newlines[0]) if len(newlines) else -1
+    width = newline if newline != -1 else end
+    if width and raw[width-1] == ord('\r'):
+        width -= 1
+    stride = newline + 1 - width if newline != -1 else 1
+    height = (end + stride) // (width + stride)
+    if height * (width + stride) - stride != end:
+        raise ValueError('grid lines are not all the same width')
+    return as_strided(raw, shape=(height, width), strides=(width + stride, 1), writeable=False)
+
+def read_grid(input_file):
+    'Character grid as a read-only uint8 array backed by the mapped file. Copy it before editing cells.'
+    import numpy as np
+    return grid_view(np.frombuffer(map_input(input_file), dtype=np.uint8))
+
+def read_grids(input_file):
+    'Blank-line separated character grids, each a read-only uint8 view of the mapped file.'
+    import numpy as np
+    buffer = map_input(input_file)
+    raw = np.frombuffer(buffer, dtype=np.uint8)
+    grids = []
+    start = 0
+    while start < len(raw):
+        stop = buffer.find(b'\n\n', start)
+        if stop == -1:
+            stop = len(raw)
+        if stop > start:
+            grids.append(grid_view(raw[start:stop]))
+        start = stop + 2
+    return grids
+
+class IndexedHeap:
+    '''
+    Binary min-heap of the integer nodes 0..n-1 that tracks each node's position, so changing a
+    priority moves the existing entry instead of leaving a stale one behind. Built from a list of
+    initial priorities in O(n), with None for nodes that start outside the heap. Ties pop in no
+    particular order.
+    '''
+    def __init__(self, priorities) -> None:
+        self.priorities = list(priorities)
+        self.heap = [node for node, priority in enumerate(self.priorities) if priority is not None]
+        self.positions = [None] * len(self.priorities)
+        for index, node in enumerate(self.heap):
+            self.positions[node] = index
+        for index in reversed(range(len(self.heap) // 2)):
+            self._sift_down(index)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, node):
+        return self.positions[node] is not None
+
+    def priority(self, node):
+        return self.priorities[node]
+
+    def push(self, node, priority):
+        'Add node, or move it to a new priority if it is already queued.'
+        position = self.positions[node]
+        old_priority = self.priorities[node]
+        self.priorities[node] = priority
+        if position is None:
+            self.positions[node] = len(self.heap)
+            self.heap.append(node)
+            self._sift_up(len(self.heap) - 1)
+        elif priority < old_priority:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def decrease_key(self, node, priority):
+        'Lower the priority of a queued node. Raise ValueError if that would raise it.'
+        if priority > self.priorities[node]:
+            raise ValueError(f'new priority {priority} is above the current {self.priorities[node]}')
+        self.priorities[node] = priority
+        self._sift_up(self.positions[node])
+
+    def pop(self):
+        'Remove and return (priority, node) for the lowest priority node. Raise KeyError if empty.'
+        if not self.heap:
+            raise KeyError('pop from an empty priority queue')
+        heap = self.heap
+        node = heap[0]
+        last = heap.pop()
+        self.positions[node] = None
+        if heap:
+            heap[0] = last
+            self.positions[last] = 0
+            self._sift_down(0)
+        return self.priorities[node], node
+
+    def _sift_up(self, index):
+        heap, positions, priorities = self.heap, self.positions, self.priorities
+        node = heap[index]
+        priority = priorities[node]
+        while index:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if priorities[parent] <= priority:
+                break
+            heap[index] = parent
+            positions[parent] = index
+            index = parent_index
+        heap[index] = node
+        positions[node] = index
+
+    def _sift_down(self, index):
+        heap, positions, priorities = self.heap, self.positions, self.priorities
+        size = len(heap)
+        node = heap[index]
+        priority = priorities[node]
+        child_index = 2*index + 1
+        while child_index < size:
+            child = heap[child_index]
+            right_index = child_index + 1
+            if right_index < size and priorities[heap[right_index]] < priorities[child]:
+                child_index = right_index
+                child = heap[child_index]
+            if priorities[child] >= priority:
+                break
+            heap[index] = child
+            positions[child] = index
+            index = child_index
+            child_index = 2*index + 1
+        heap[index] = node
+        positions[node] = index
+
+class Cycle:
+    '''
+    Where a repeated-state simulation starts repeating: step prefix+period gives the same state as
+    step prefix. metrics[i] is the metric of the state after i steps, kept for every step simulated,
+    so any step count can be answered from them. period is None if no repeat turned up in time.
+    '''
+    def __init__(self, prefix, period, metrics) -> None:
+        self.prefix = prefix
+        self.period = period
+        self.metrics = metrics
+
+    def index(self, steps):
+        'The simulated step whose state matches the state after steps steps.'
+        if steps < len(self.metrics):
+            return steps
+        if self.period is None:
+            raise ValueError(f'no cycle was found, so step {steps} was never simulated')
+        return self.prefix + (steps - self.prefix) % self.period
+
+    def at(self, steps):
+        'Metric of the state after steps steps.'
+        return self.metrics[self.index(steps)]
+
+    def total(self, steps):
+        '''
+        Sum of the metrics of steps 1..steps, for per-step tallies. Metrics may be numbers or
+        equal length tuples of numbers, which are summed element by element.
+        '''
+        if steps < len(self.metrics):
+            return _sum_metrics(self.metrics[1:steps+1])
+        repeats, rest = divmod(steps - self.prefix, self.period)
+        cycle_total = _sum_metrics(self.metrics[self.prefix+1:self.prefix+self.period+1])
+        return _sum_metrics(self.metrics[1:self.prefix+rest+1] + [_scale_metric(cycle_total, repeats)])
+
+def _sum_metrics(values):
+    if values and isinstance(values[0], tuple):
+        return tuple(map(sum, zip(*values)))
+    return sum(values)
+
+def _scale_metric(value, factor):
+    return tuple(part * factor for part in value) if isinstance(value, tuple) else value * factor
+
+def find_cycle(state, step, encode, metric, limit=None):
+    '''
+    Run step(state) -> state until a state repeats, hashing encode(state) into a dict of the step
+    it was first seen at. step may update state in place as long as encode copies what it needs.
+    Stores metric(state) for each step so the Cycle can answer later steps without re-running,
+    and gives up with period None after limit steps. Memory grows with every step taken, so for
+    large states or long runs where only the prefix and period are needed, use brent instead.
+    '''
+    seen = {encode(state): 0}
+    metrics = [metric(state)]
+    steps = 0
+    while limit is None or steps < limit:
+        state = step(state)
+        steps += 1
+        metrics.append(metric(state))
+        key = encode(state)
+        if key in seen:
+            METRICS.add('cycle_steps', steps)
+            return Cycle(seen[key], steps - seen[key], metrics)
+        seen[key] = steps
+    METRICS.add('cycle_steps', steps)
+    return Cycle(0, None, metrics)
+
+def brent(state, step, encode=lambda state: state):
+    '''
+    (prefix, period) of the sequence state, step(state), ... with Brent's algorithm, holding two
+    states at a time instead of every encoded state. step must return new states rather than
+    mutate its argument. Use find_cycle instead when per-step metrics are needed.
+    '''
+    power = period = 1
+    tortoise, hare = state, step(state)
+    while encode(tortoise) != encode(hare):
+        if power == period:
+            tortoise = hare
+            power *= 2
+            period = 0
+        hare = step(hare)
+        period += 1
+
+    tortoise = hare = state
+    for _ in range(period):
+        hare = step(hare)
+    prefix = 0
+    while encode(tortoise) != encode(hare):
+        tortoise, hare = step(tortoise), step(hare)
+        prefix += 1
+    return prefix, period
+
+# Arrays a parallel_map worker attached to, and the shared memory blocks keeping them alive
+_SHARED_ARRAYS = {}
+_SHARED_BLOCKS = []
+
+def _attach_shared(specs, metrics_enabled):
+    import numpy as np
+    from multiprocessing import shared_memory
+    METRICS.enabled = metrics_enabled
+    # Forked workers start with a copy of the parent's counts, which it already has
+    METRICS.collect()
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array.flags.writeable = False
+        _SHARED_BLOCKS.append(block)
+        _SHARED_ARRAYS[name] = array
+
+def _run_chunk(func, chunk):
+    return func(chunk, _SHARED_ARRAYS), METRICS.collect()
+
+def parallel_map(func, tasks, arrays=None, reduce=list, jobs=None, chunks_per_job=4):
+    '''
+    reduce(func(chunk, arrays) for each chunk of tasks), spread over a process pool. arrays is a
+    dict of NumPy arrays copied into shared memory once, so workers read them without each task
+    pickling the data; workers get read-only views. Chunks take every nth task, which balances
+    triangular loops but means results arrive in no useful order. Runs everything as one chunk in
+    this process when there is one job, we are already inside a pool worker or we are off the main
+    thread. Counters workers add to METRICS are merged back.
+    '''
+    import multiprocessing
+    import threading
+    arrays = arrays or {}
+    tasks = list(tasks)
+    jobs = min(jobs or os.cpu_count(), len(tasks))
+    # Daemonic processes, like run.py --all workers, may not start children of their own, and
+    # forking from a thread such as a daemon.py handler can hand children locks other threads hold
+    if jobs <= 1 or multiprocessing.current_process().daemon or threading.current_thread() is not threading.main_thread():
+        return reduce([func(tasks, arrays)])
+
+    import numpy as np
+    from multiprocessing import shared_memory
+    chunk_count = min(len(tasks), jobs * chunks_per_job)
+    chunks = [tasks[start::chunk_count] for start in range(chunk_count)]
+    blocks, specs = [], {}
+    try:
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            specs[name] = (block.name, array.shape, array.dtype.str)
+        with multiprocessing.Pool(jobs, initializer=_attach_shared, initargs=(specs, METRICS.enabled)) as pool:
+            results = []
+            for result, counts in pool.starmap(_run_chunk, [(func, chunk) for chunk in chunks]):
+                results.append(result)
+                for counter, value in counts.items():
+                    METRICS.add(counter, value)
+        return reduce(results)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+ROOT = Path(__file__).resolve().parent
+
+def day_module_name(day):
+    'Dotted module name of a day\'s solver, e.g. 5 -> Day05.almanac.'
+    scripts = sorted((ROOT / f'Day{day:02d}').glob('*.py'))
+    if not scripts:
+        raise ValueError(f'no solver found for day {day}')
+    return f'Day{day:02d}.{scripts[0].stem}'
+
+def day_module(day):
+    # __import__ rather than importlib.import_module so -X importtime reports the solver module too
+    return __import__(day_module_name(day), fromlist=['main'])
+
+def parse_days(specs):
+    'Day numbers from command line specs like "5", "1-25" or "3,7,9". No specs means every day.'
+    if not specs:
+        return list(range(1, 26))
+    days = []
+    for spec in specs:
+        for part in spec.split(','):
+            if '-' in part:
+                first, last = part.split('-')
+                days.extend(range(int(first), int(last)+1))
+            else:
+                days.append(int(part))
+    return days
+
+def parse_cache_dir():
+    'Where parsed inputs and memo stores are cached. Set AOC_PARSE_CACHE to another directory, or to 0 to turn caching off.'
+    setting = os.environ.get('AOC_PARSE_CACHE', str(ROOT / '.cache' / 'parsed'))
+    return None if setting == '0' else Path(setting)
+
+def cached_parse(version):
+    '''
+    Decorator for read_input functions that are slow enough to be worth skipping. Results are stored
+    on disk keyed by a hash of the input file, the parser and its version, so bump version whenever
+    the parsed structure changes. Arrays are saved as npz and everything else is pickled.
+    '''
+    def decorator(read_input):
+        @functools.wraps(read_input)
+        def wrapper(input_file):
+            cache_dir = parse_cache_dir()
+            if cache_dir is None:
+                return read_input(input_file)
+            with open(input_file, 'rb') as input:
+                digest = hashlib.file_digest(input, 'sha256')
+            # Scripts run as __main__ pickle their classes under that name, so keep them apart
+            parser = f'{read_input.__module__}:{read_input.__code__.co_filename}:{read_input.__qualname__}:{version}'
+            digest.update(parser.encode())
+            key = digest.hexdigest()
+            for suffix in ('.npz', '.pkl'):
+                path = cache_dir / (key + suffix)
+                if path.exists():
+                    try:
+                        if suffix == '.npz':
+                            import numpy as np
+                            with np.load(path) as arrays:
+                                return arrays['data']
+                        with open(path, 'rb') as cached:
+                            return pickle.load(cached)
+                    except Exception:
+                        # Corrupt or stale entries are just rebuilt
+                        path.unlink(missing_ok=True)
+
+            data = read_input(input_file)
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            is_array = type(data).__module__ == 'numpy' and type(data).__name__ == 'ndarray'
+            path = cache_dir / (key + ('.npz' if is_array else '.pkl'))
+            temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+            with open(temp_path, 'wb') as output:
+                if is_array:
+                    import numpy as np
+                    np.savez(output, data=data)
+                else:
+                    pickle.dump(data, output, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+            return data
+        return wrapper
+    return decorator
+
+# One sqlite connection per process and thread, since connections must not cross a fork and
+# sqlite refuses to use them from any thread but the one that opened them
+_MEMO_CONNECTIONS = {}
+
+def _memo_connection():
+    import sqlite3
+    import threading
+    cache_dir = parse_cache_dir()
+    if cache_dir is None or os.environ.get('AOC_MEMO') == '0':
+        return None
+    key = (os.getpid(), threading.get_ident(), cache_dir)
+    if key not in _MEMO_CONNECTIONS:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(cache_dir / 'memo.sqlite', timeout=30)
+            # Memo entries can always be recomputed, so trade durability for cheap commits
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute('CREATE TABLE IF NOT EXISTS memo (function TEXT, key TEXT, value BLOB, PRIMARY KEY (function, key))')
+        except sqlite3.Error:
+            connection = None
+        _MEMO_CONNECTIONS[key] = connection
+    return _MEMO_CONNECTIONS[key]
+
+def persistent_memo(version):
+    '''
+    Decorator that memoises a function of plain literal arguments in a sqlite store next to the
+    parse cache, so results outlive the process and are shared by every run and pool worker. Keys
+    are the repr of the arguments and values are pickled; bump version whenever results change.
+    Calls go straight to the function while caching is off, AOC_MEMO is 0 or the store cannot be
+    opened.
+    '''
+    def decorator(func):
+        import sqlite3
+        name = f'{Path(func.__code__.co_filename).stem}.{func.__qualname__}:{version}'
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            connection = _memo_connection()
+            if connection is None:
+                return func(*args)
+            key = repr(args)
+            try:
+                row = connection.execute('SELECT value FROM memo WHERE function = ? AND key = ?', (name, key)).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row is not None:
+                return pickle.loads(row[0])
+            value = func(*args)
+            try:
+                with connection:
+                    connection.execute('INSERT OR REPLACE INTO memo VALUES (?, ?, ?)',
+                                       (name, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+            except sqlite3.Error:
+                pass
+            return value
+        return wrapper
+    return decorator
+
+class Engines:
+    '''
+    Named interchangeable implementations of one step of a day's solver, so the reference version
+    stays next to a faster one for A/B timing and answer diffs. A day keeps one at module level as
+    ENGINES, registers functions on it and calls it in place of any one of them; the default is
+    used until select picks another, e.g. from --engine or bench.py.
+    '''
+    def __init__(self, default) -> None:
+        self.default = default
+        self.implementations = {}
+        self.selected = default
+
+    def register(self, name):
+        def decorator(func):
+            self.implementations[name] = func
+            return func
+        return decorator
+
+    def names(self):
+        return list(self.implementations)
+
+    def select(self, name=None):
+        'Use the named implementation from now on, or the default for None. Raise ValueError for unknown names.'
+        name = name or self.default
+        if name not in self.implementations:
+            raise ValueError(f'unknown engine {name!r}, expected one of {", ".join(self.implementations)}')
+        self.selected = name
+
+    def __call__(self, *args, **kwargs):
+        return self.implementations[self.selected](*args, **kwargs)
+
+def engine_names(module):
+    'Names of the engines a day module offers, empty if it has only the one implementation.'
+    engines = getattr(module, 'ENGINES', None)
+    return engines.names() if engines else []
+
+class Metrics:
+    '''
+    Counters from solver hot loops. Solvers tally into locals or read numbers they already keep and
+    add them once per call, so nothing is paid per iteration and add is a no-op while disabled.
+    '''
+    def __init__(self) -> None:
+        self.enabled = False
+        self.counts = {}
+
+    def add(self, name, value):
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def collect(self):
+        'Counts so far, starting afresh for the next phase.'
+        counts, self.counts = self.counts, {}
+        return counts
+
+METRICS = Metrics()
+
+def json_value(value):
+    'Plain python number for numpy scalars so answers serialise.'
+    return value.item() if hasattr(value, 'item') else str(value)
+
+def solve_with_metrics(module, data):
+    'Run each star with METRICS enabled and print the answers and their counters as json.'
+    import json
+    # Count the solver's own work, not lookups an earlier run left in the memo store
+    os.environ['AOC_MEMO'] = '0'
+    METRICS.enabled = True
+    METRICS.collect()
+    results = {}
+    for star in ('star1', 'star2'):
+        if hasattr(module, star):
+            answer = getattr(module, star)(data)
+            results[star] = {'answer': answer, 'counters': METRICS.collect()}
+    METRICS.enabled = False
+    print(json.dumps(results, default=json_value))
+    return results
+
+def follow_solver(module, input_file):
+    '''
+    Feed a day's Stream accumulator tokens as they arrive from follow and print the current answers
+    whenever the input catches up, until stdin closes or the follow is interrupted.
+    '''
+    stream = module.Stream()
+    try:
+        for token in follow(input_file, stream.separator):
+            if token is None:
+                print(*stream.answers(), flush=True)
+            else:
+                stream.feed(token)
+    except KeyboardInterrupt:
+        pass
+    return stream.answers()
+
+PROFILE_PHASES = ('parse', 'star1', 'star2')
+
+def profile_solver(module, input_file):
+    '''
+    Run a solver's phases once for wall time, then again under cProfile and tracemalloc with METRICS
+    on. Writes a .prof dump per phase and a summary json next to the input file, e.g. input.star1.prof
+    and input.profile.json, and prints the summary with the top functions of each phase.
+    '''
+    import cProfile
+    import json
+    import pstats
+    import time
+    import tracemalloc
+    # Profile the real parse and stars rather than cache loads
+    os.environ['AOC_PARSE_CACHE'] = '0'
+    os.environ['AOC_MEMO'] = '0'
+    phases = [phase for phase in PROFILE_PHASES if phase == 'parse' or hasattr(module, phase)]
+
+    def run(phase, data):
+        return module.read_input(input_file) if phase == 'parse' else getattr(module, phase)(data)
+
+    summary = {}
+    data = None
+    for phase in phases:
+        start = time.perf_counter()
+        result = run(phase, data)
+        summary[phase] = {'seconds': time.perf_counter() - start}
+        if phase == 'parse':
+            data = result
+
+    input_path = Path(input_file)
+    METRICS.enabled = True
+    METRICS.collect()
+    tracemalloc.start()
+    data = None
+    for phase in phases:
+        profiler = cProfile.Profile()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = profiler.runcall(run, phase, data)
+        summary[phase]['peak_bytes'] = tracemalloc.get_traced_memory()[1] - before
+        summary[phase]['counters'] = METRICS.collect()
+        if phase == 'parse':
+            data = result
+        dump = input_path.with_name(f'{input_path.stem}.{phase}.prof')
+        profiler.dump_stats(dump)
+        summary[phase]['profile'] = dump.name
+        print(f'{phase:5}  {summary[phase]["seconds"]:9.4f}s  peak {summary[phase]["peak_bytes"]/2**20:8.2f} MiB  -> {dump}')
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(8)
+    tracemalloc.stop()
+    METRICS.enabled = False
+
+    with open(input_path.with_name(f'{input_path.stem}.profile.json'), 'w') as output:
+        json.dump(summary, output, indent=2)
+    return summary